@@ -2,6 +2,8 @@
 ASGI config for demo_tables project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the project with it (e.g. ``uvicorn demo_tables.asgi:application``) to use
+the server-sent event change feed at /events/<url_name>/.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "movies.static_assets.StaticAssetsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,6 +59,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "movies.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "demo_tables.urls"
@@ -95,6 +98,64 @@ DATABASES = {
     }
 }
 
+# Production profile: pooled connections to the same file in two roles, a single writer
+# and a pool of query only readers (demo_tables/sqlite_pool). WAL lets the readers work
+# while a write is in progress. Pragmas are set once per connection by init_command.
+# Compare with the default setup using: python manage.py benchmark_db
+SQLITE_PRAGMAS = ";".join(
+    [
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA busy_timeout = 5000",
+        "PRAGMA cache_size = -65536",  # 64 MiB
+        "PRAGMA mmap_size = 268435456",  # 256 MiB
+        "PRAGMA temp_store = MEMORY",
+    ]
+)
+SQLITE_PRODUCTION = {
+    "default": {
+        "ENGINE": "demo_tables.sqlite_pool",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 0,  # connections go back to the pool after each request
+        "OPTIONS": {
+            "init_command": SQLITE_PRAGMAS,
+            # Take the write lock when the transaction starts, not on its first write
+            "transaction_mode": "IMMEDIATE",
+            "pool": {"size": 1, "timeout": 30},
+        },
+    },
+    "read": {
+        "ENGINE": "demo_tables.sqlite_pool",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {
+            "init_command": f"{SQLITE_PRAGMAS};PRAGMA query_only = ON",
+            "pool": {"size": 8, "timeout": 10},
+        },
+        "TEST": {"MIRROR": "default"},
+    },
+}
+if not DEBUG:
+    DATABASES = SQLITE_PRODUCTION
+    DATABASE_ROUTERS = ["demo_tables.sqlite_pool.router.ReadWriteRouter"]
+
+
+# Shared by the worker processes of one host, so a write in one process invalidates the
+# state the others keep: saved table preferences, page rows and virtual scroll orders.
+# FileBasedCache.incr() is not atomic, so movies/versions.py bumps the version counters
+# under a host wide lock.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache",
+    }
+}
+
+
+# Sessions are read from the cache above, and only written to the database when a
+# value changes, see movies/sessions.py
+SESSION_ENGINE = "movies.sessions"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -131,6 +192,21 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic writes content hashed names with gzip and brotli variants, which
+# StaticAssetsMiddleware serves with long lived cache headers (movies/static_assets.py).
+# In development the source files are served.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "movies.static_assets.CompressedManifestStaticFilesStorage"
+        )
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -150,3 +226,21 @@ DJANGO_FLATPICKR = {
         "allowInput": True,
     },
 }
+
+# On-demand request profiling, see movies/profiling.py
+# Profiles are listed at /admin/profiles/ labelled with RELEASE
+PROFILE_DIR = BASE_DIR / "profiles"
+PROFILE_KEEP = 100
+RELEASE = os.environ.get("DEMO_TABLES_RELEASE", "dev")
+
+# Background exports, see movies/exports.py
+EXPORT_DIR = BASE_DIR / "exports"
+EXPORT_EXPIRY = 3600
+EXPORT_WORKERS = 2
+
+# Coalescing of identical concurrent table queries, see movies/coalesce.py
+# Must be on a local filesystem shared by the worker processes of one host
+COALESCE_DIR = BASE_DIR / "coalesce"
+
+# Allowed overrun of the budgets in movies/perf_budgets.json, see movies/tests.py
+PERF_BUDGET_TOLERANCE = 0.5
@@ -0,0 +1,85 @@
+import os
+import queue
+import threading
+
+from django.db.backends.sqlite3 import base
+from django.db.utils import OperationalError
+
+# SQLite backend that keeps connections open in a pool per database alias instead of
+# closing them at the end of each request. A request gets a connection whose pragmas are
+# already set and whose page cache and memory map are warm.
+# Use with CONN_MAX_AGE = 0: Django closes the connection after each request, which puts
+# it back in the pool. Pool settings go in OPTIONS["pool"]: "size", the most connections
+# open at once (1 makes the alias a single writer), and "timeout", the seconds to wait
+# for a free connection.
+
+POOL_SIZE = 8
+POOL_TIMEOUT = 10
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class Pool:
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.timeout = timeout
+
+    def acquire(self, connect):
+        """Return an idle connection, or a new one from connect() if none is idle."""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f"No database connection free after {self.timeout} seconds"
+            )
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return connect()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, connection):
+        try:
+            # Anything left uncommitted by the last user is discarded
+            if connection.in_transaction:
+                connection.rollback()
+        except base.Database.Error:
+            connection.close()
+        else:
+            self.idle.put(connection)
+        finally:
+            self.slots.release()
+
+
+def get_pool(alias, **options):
+    # Keyed by process too: connections must not be shared with a forked child
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = Pool(**options)
+        return _pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pool = get_pool(self.alias, **kwargs.pop("pool", {}))
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        if self.is_in_memory_db():
+            return super().get_new_connection(conn_params)
+        connect = super().get_new_connection
+        return self.pool.acquire(lambda: connect(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.is_in_memory_db():
+            super()._close()
+        else:
+            self.pool.release(self.connection)
@@ -0,0 +1,25 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_DB_ALIAS = "read"
+
+
+class ReadWriteRouter:
+    """
+    Send writes to the default alias, the single writer, and reads to the read alias.
+    Reads inside a transaction on the writer stay on it so they see its changes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return READ_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
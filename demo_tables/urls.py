@@ -1,30 +1,113 @@
 from django.contrib import admin
 from django.urls import path
-from movies.views import *
+from movies.autocomplete import title_autocomplete
+from movies.change_feed import movie_events
+from movies.histograms import histograms
+from movies.lazy_views import lazy_view
+from movies.profiling import profile_download, profile_list
 
+# Views are imported on first use so a worker boots without loading
+# django_tableaux, django_filters and the table/filter/form modules.
 urlpatterns = [
+    path("admin/profiles/", profile_list, name="profile_list"),
+    path(
+        "admin/profiles/<str:name>.<str:kind>",
+        profile_download,
+        name="profile_download",
+    ),
     path("admin/", admin.site.urls),
-    path("play/", PlayView.as_view(), name="play"),
-    path("interactive/", InteractiveView.as_view(), name="interactive"),
-    path("tableaux/basic/", BasicInteractiveView.as_view(), name="basic_interactive"),
-    path("", BasicView.as_view(), name="basic"),
-    path("new/", BasicViewNew.as_view(), name="basic-new"),
-    path("rowcol/", RowColSettingsView.as_view(), name="row_col"),
-    path("select/", SelectActionsView.as_view(), name="select_actions"),
-    path("inf_scroll/", InfiniteScrollView.as_view(), name="infinite_scroll"),
-    path("inf_load/", InfiniteLoadView.as_view(), name="infinite_load"),
-    path("responsive/", ResponsiveView.as_view(), name="responsive"),
-    path("responsive/component/", ResponsiveComponentView.as_view(), name="responsive-component"),
-    path("filter_t/", MoviesFilterToolbarView.as_view(), name="filter_toolbar"),
-    path("filter_m/", MoviesFilterModalView.as_view(), name="filter_modal"),
-    path("filter_h/", MoviesFilterHeaderView.as_view(), name="filter_header"),
-    path("editable/", MoviesEditableView.as_view(), name="editable"),
-    path("row_click/", MoviesRowClickView.as_view(), name="row_click"),
-    path("row_click_modal/", MoviesRowClickModalView.as_view(), name="row_click_modal"),
-    path(
-        "row_click_custom/", MoviesRowClickCustomView.as_view(), name="row_click_custom"
-    ),
-    path("action/", ActionPageView.as_view(), name="action_page"),
-    path("detail/<int:pk>/", MovieDetailView.as_view(), name="movie_detail"),
-    path("modal/<int:pk>/", MovieModalView.as_view(), name="movie_modal"),
+    path("play/", lazy_view("movies.views.PlayView"), name="play"),
+    path("interactive/", lazy_view("movies.views.InteractiveView"), name="interactive"),
+    path(
+        "tableaux/basic/",
+        lazy_view("movies.views.BasicInteractiveView"),
+        name="basic_interactive",
+    ),
+    path("", lazy_view("movies.views.BasicView"), name="basic"),
+    path("new/", lazy_view("movies.views.BasicViewNew"), name="basic-new"),
+    path("rowcol/", lazy_view("movies.views.RowColSettingsView"), name="row_col"),
+    path("select/", lazy_view("movies.views.SelectActionsView"), name="select_actions"),
+    path(
+        "inf_scroll/",
+        lazy_view("movies.views.InfiniteScrollView"),
+        name="infinite_scroll",
+    ),
+    path("inf_load/", lazy_view("movies.views.InfiniteLoadView"), name="infinite_load"),
+    path("responsive/", lazy_view("movies.views.ResponsiveView"), name="responsive"),
+    path(
+        "responsive/component/",
+        lazy_view("movies.views.ResponsiveComponentView"),
+        name="responsive-component",
+    ),
+    path(
+        "filter_t/",
+        lazy_view("movies.views.MoviesFilterToolbarView"),
+        name="filter_toolbar",
+    ),
+    path(
+        "filter_m/",
+        lazy_view("movies.views.MoviesFilterModalView"),
+        name="filter_modal",
+    ),
+    path(
+        "filter_h/",
+        lazy_view("movies.views.MoviesFilterHeaderView"),
+        name="filter_header",
+    ),
+    path("editable/", lazy_view("movies.views.MoviesEditableView"), name="editable"),
+    path("row_click/", lazy_view("movies.views.MoviesRowClickView"), name="row_click"),
+    path(
+        "row_click_modal/",
+        lazy_view("movies.views.MoviesRowClickModalView"),
+        name="row_click_modal",
+    ),
+    path(
+        "row_click_custom/",
+        lazy_view("movies.views.MoviesRowClickCustomView"),
+        name="row_click_custom",
+    ),
+    path("action/", lazy_view("movies.views.ActionPageView"), name="action_page"),
+    path(
+        "detail/<int:pk>/",
+        lazy_view("movies.views.MovieDetailView"),
+        name="movie_detail",
+    ),
+    path(
+        "modal/<int:pk>/", lazy_view("movies.views.MovieModalView"), name="movie_modal"
+    ),
+    path("events/<str:url_name>/", movie_events, name="movie_events"),
+    path("autocomplete/title/", title_autocomplete, name="title_autocomplete"),
+    path("histograms/", histograms, name="histograms"),
+    path(
+        "data/<str:url_name>/",
+        lazy_view("movies.table_data.table_data"),
+        name="table_data",
+    ),
+    path("mobile/", lazy_view("movies.views.MobileView"), name="mobile"),
+    path("rollups/", lazy_view("movies.views.RollupView"), name="rollups"),
+    path(
+        "rollups/<int:year>/",
+        lazy_view("movies.views.RollupView"),
+        name="rollup_months",
+    ),
+    path(
+        "rollups/<int:year>/movies/",
+        lazy_view("movies.views.RollupMoviesView"),
+        name="rollup_movies",
+    ),
+    path(
+        "rollups/<int:year>/<int:month>/movies/",
+        lazy_view("movies.views.RollupMoviesView"),
+        name="rollup_movies_month",
+    ),
+    path(
+        "exports/<str:job_id>/",
+        lazy_view("movies.exports.export_status"),
+        name="export_status",
+    ),
+    path(
+        "exports/<str:job_id>/download/",
+        lazy_view("movies.exports.export_download"),
+        name="export_download",
+    ),
 ]
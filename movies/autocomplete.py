@@ -0,0 +1,163 @@
+import threading
+import unicodedata
+from bisect import insort
+from heapq import nsmallest
+from itertools import chain
+
+from django.db import transaction
+from django.http import JsonResponse
+
+from . import versions
+from .models import Movie
+
+# In-memory prefix index over normalized movie titles. Every trie node keeps the top
+# suggestions of its subtree ordered by popularity, so a lookup costs one step per
+# character of the prefix regardless of the number of movies.
+# The index is built on first use. A version counter in the shared cache tells each
+# process when another one has written Movies: the writer applies its own change to
+# its index, the others rebuild theirs in the background (versions.VersionedState).
+
+SUGGESTION_LIMIT = 10
+VERSION_KEY = "movies:autocomplete:version"
+
+
+def normalize(text):
+    """Casefold, strip accents and collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.entries = {}
+        self.top = []
+
+
+class TitleIndex:
+    def __init__(self, k=SUGGESTION_LIMIT):
+        self.k = k
+        self.root = _Node()
+        self.keys = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def build(cls, rows, k=SUGGESTION_LIMIT):
+        """rows is an iterable of (pk, title, popularity)."""
+        index = cls(k)
+        for pk, title, popularity in rows:
+            index._add(pk, title, popularity)
+        return index
+
+    def add(self, pk, title, popularity):
+        with self.lock:
+            self._remove(pk)
+            self._add(pk, title, popularity)
+
+    def remove(self, pk):
+        with self.lock:
+            self._remove(pk)
+
+    def suggest(self, prefix, limit=SUGGESTION_LIMIT):
+        """Return up to limit (pk, title) tuples, most popular first."""
+        key = normalize(prefix)
+        if prefix[-1:].isspace() and key:
+            key += " "
+        with self.lock:
+            node = self.root
+            for char in key:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            return [(pk, title) for _, title, pk in node.top[:limit]]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _path(self, key, create=False):
+        node = self.root
+        path = [node]
+        for char in key:
+            if create:
+                node = node.children.setdefault(char, _Node())
+            else:
+                node = node.children[char]
+            path.append(node)
+        return path
+
+    def _add(self, pk, title, popularity):
+        key = normalize(title)
+        if not key:
+            return
+        entry = (-float(popularity or 0), title, pk)
+        self.keys[pk] = (key, entry)
+        path = self._path(key, create=True)
+        path[-1].entries[pk] = entry
+        # A new entry can only push others out so each top list is updated in place
+        for node in path:
+            if len(node.top) < self.k or entry < node.top[-1]:
+                insort(node.top, entry)
+                del node.top[self.k :]
+
+    def _remove(self, pk):
+        if pk not in self.keys:
+            return
+        key, entry = self.keys.pop(pk)
+        path = self._path(key)
+        del path[-1].entries[pk]
+        # Rebuild the top lists that held the entry, deepest node first
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if entry in node.top:
+                candidates = chain(
+                    node.entries.values(),
+                    *(child.top for child in node.children.values()),
+                )
+                node.top = nsmallest(self.k, candidates)
+            if depth and not node.entries and not node.children:
+                del path[depth - 1].children[key[depth - 1]]
+
+
+def _build_index():
+    return TitleIndex.build(
+        Movie.objects.values_list("pk", "title", "popularity").iterator()
+    )
+
+
+_index = versions.VersionedState(VERSION_KEY, _build_index)
+
+
+def current_version():
+    return versions.current(VERSION_KEY)
+
+
+def invalidate():
+    """Make every process rebuild its index, after writes that skip the signals."""
+    return versions.bump(VERSION_KEY)
+
+
+def get_index():
+    return _index.get()
+
+
+def movie_saved(instance):
+    pk, title, popularity = instance.pk, instance.title, instance.popularity
+    transaction.on_commit(
+        lambda: _index.changed(lambda index: index.add(pk, title, popularity))
+    )
+
+
+def movie_deleted(instance):
+    pk = instance.pk
+    transaction.on_commit(lambda: _index.changed(lambda index: index.remove(pk)))
+
+
+def title_autocomplete(request):
+    query = request.GET.get("q", "")
+    results = get_index().suggest(query) if query.strip() else []
+    return JsonResponse(
+        {"results": [{"id": pk, "title": title} for pk, title in results]}
+    )
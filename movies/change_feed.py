@@ -0,0 +1,222 @@
+import asyncio
+import copy
+import threading
+import time
+from dataclasses import dataclass
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import NoReverseMatch, resolve, reverse
+
+from . import row_cache, versions
+from .lazy_views import view_class as resolve_view_class
+from .tableaux_compat import load_state
+
+# Pushes Movie changes to open tables over server-sent events.
+# A committed change is numbered by a version counter in the shared cache and stored
+# under its number, so changes made by other worker processes and by management commands
+# reach every process. While a process has SSE connections, a poller thread reads new
+# changes and hands them to the in-process broker, where each connection subscribes with
+# an asyncio queue. Changes that expired before they were read, and bulk writes that
+# change too many rows to list, become a reload event for the whole table.
+
+KEEPALIVE_SECONDS = 15
+POLL_SECONDS = 0.5
+VERSION_KEY = "change_feed:version"
+EVENT_TIMEOUT = 60
+# More unread changes than this are sent as one reload
+MAX_EVENTS = 100
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    pk: str = ""
+    deleted: bool = False
+    reload: bool = False
+
+
+RELOAD = ChangeEvent(reload=True)
+
+
+def _event_key(version):
+    return f"change_feed:event:{version}"
+
+
+class ChangePoller:
+    """Read the changes published since the last poll, in order."""
+
+    def __init__(self):
+        self.version = versions.current(VERSION_KEY)
+        self.retried = False
+
+    def poll(self):
+        latest = versions.current(VERSION_KEY)
+        if latest <= self.version:
+            return []
+        if latest - self.version > MAX_EVENTS:
+            self.version = latest
+            return [RELOAD]
+        numbers = range(self.version + 1, latest + 1)
+        found = cache.get_many([_event_key(n) for n in numbers])
+        events = []
+        for n in numbers:
+            event = found.get(_event_key(n))
+            if event is None:
+                # The publisher numbers a change before it stores it, so look again once
+                if not self.retried:
+                    self.retried = True
+                    break
+                event = RELOAD
+            self.retried = False
+            self.version = n
+            events.append(event)
+        return events
+
+
+class ChangeBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._poller = None
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+            if self._poller is None:
+                self._poller = threading.Thread(
+                    target=self._poll, args=(ChangePoller(),), daemon=True
+                )
+                self._poller.start()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+    def _poll(self, poller):
+        while True:
+            time.sleep(POLL_SECONDS)
+            with self._lock:
+                if not self._subscribers:
+                    self._poller = None
+                    return
+            for event in poller.poll():
+                self.dispatch(event)
+
+    def dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+
+
+broker = ChangeBroker()
+
+
+def publish(event):
+    """Publish event to the change feeds of every process."""
+    version = versions.bump(VERSION_KEY)
+    cache.set(_event_key(version), event, EVENT_TIMEOUT)
+
+
+def publish_change(instance, deleted=False):
+    # Clients only see committed data so wait for the transaction to finish
+    event = ChangeEvent(pk=str(instance.pk), deleted=deleted)
+    transaction.on_commit(lambda: publish(event))
+
+
+def publish_reload():
+    """Tell open tables to reload, after a bulk write that sent no signals."""
+    transaction.on_commit(lambda: publish(RELOAD))
+
+
+def sse(event, data):
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+    return f"event: {event}\n{lines}\n"
+
+
+def render_row(request, view_class, pk):
+    """Render the <tr> for pk as the view would, or None if it has left the table."""
+    # Read the session as it is now; the connection's own copy is from when it opened
+    request = copy.copy(request)
+    engine = import_module(settings.SESSION_ENGINE)
+    request.session = engine.SessionStore(request.session.session_key)
+    view = view_class()
+    view.setup(request)
+    load_state(view, request.GET)
+    try:
+        response = view.render_row(id=pk)
+        return response.render().content.decode()
+    except IndexError:
+        return None
+    finally:
+        # The stream never finishes its request, so release connections as a request end
+        # would; otherwise each open table holds a pooled read connection for good
+        for connection in connections.all(initialized_only=True):
+            if not connection.in_atomic_block:
+                connection.close()
+
+
+async def event_stream(request, view_class):
+    """
+    Yield SSE messages for changed rows that are on the client's current page,
+    as recorded by the view's PageRowCacheMixin.
+    """
+    prefix = request.GET.get("prefix", "")
+    key = row_cache.table_key(view_class, prefix)
+    session_key = request.session.session_key
+    queue = broker.subscribe()
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event.reload:
+                yield sse("reload", "")
+                continue
+            pks = await sync_to_async(row_cache.page_pks)(session_key, key)
+            if event.pk not in pks:
+                continue
+            html = None
+            if not event.deleted:
+                html = await sync_to_async(render_row)(request, view_class, event.pk)
+            if html is None:
+                yield sse("delete", f"{prefix}_tr_{event.pk}")
+            else:
+                yield sse("row", html)
+    finally:
+        broker.unsubscribe(queue)
+
+
+async def movie_events(request, url_name):
+    """
+    Server-sent event stream of changed rows for the table served at url_name.
+    Serve through demo_tables.asgi so connections do not tie up a worker thread.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server would consume the endless stream in one of its threads;
+        # 204 tells EventSource not to reconnect
+        return HttpResponse(status=204)
+    try:
+        view_class = await sync_to_async(resolve_view_class)(
+            resolve(reverse(url_name)).func
+        )
+    except NoReverseMatch:
+        raise Http404(f"No table view named '{url_name}'")
+    if view_class is None or not issubclass(view_class, row_cache.PageRowCacheMixin):
+        raise Http404(f"View '{url_name}' does not publish changes")
+    return StreamingHttpResponse(
+        event_stream(request, view_class),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,263 @@
+import contextlib
+import errno
+import functools
+import hashlib
+import os
+import pickle
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalesce within a process only
+    fcntl = None
+
+# Single-flight coalescing of identical concurrent table queries. The first request to
+# run a query (the count or a page of rows) computes its result; requests running the
+# same SQL while it is in flight wait and get a copy. Only query results are shared:
+# every request still renders its own response, with its own CSRF token and session.
+# Threads are coalesced with an in-process registry and worker processes on the same
+# host with a lock file per key in COALESCE_DIR: the process running the query locks
+# its LEADER byte, the processes waiting for it share its WAITING byte, and the result
+# is only written to a file for them when the WAITING byte is held.
+
+COALESCE_TIMEOUT = 10
+RESULT_TTL = 60
+POLL_INTERVAL = 0.005
+LEADER, WAITING = 0, 1
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+_local_lock = threading.Lock()
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.done = False
+        self.result = None
+
+
+def coalesce_dir():
+    default = Path(tempfile.gettempdir()) / "demo_tables_coalesce"
+    return Path(getattr(settings, "COALESCE_DIR", default))
+
+
+@contextlib.contextmanager
+def host_lock(name):
+    """Hold the lock called name, shared by the processes and threads of this host."""
+    if fcntl is None:
+        with _local_lock:
+            yield
+        return
+    directory = coalesce_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    # Not a .lock file, which purge_files() would remove
+    with open(directory / f"{name}.mutex", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def single_flight(key, compute):
+    """Return compute(), or a copy of the result of an identical call in flight."""
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+    if not leader:
+        if call.event.wait(COALESCE_TIMEOUT) and call.done:
+            return pickle.loads(call.result)
+        return compute()
+    try:
+        result = _across_processes(key, compute)
+        # Followers get their own copy, so they cannot change the leader's result
+        call.result, call.done = pickle.dumps(result), True
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        call.event.set()
+
+
+def _across_processes(key, compute):
+    if fcntl is None:
+        return compute()
+    directory = coalesce_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    result_path = directory / f"{key}.result"
+    started = time.time_ns()
+    lock, waited = _lock_leader(
+        directory / f"{key}.lock", time.monotonic() + COALESCE_TIMEOUT
+    )
+    if lock is None:
+        return compute()
+    with lock:
+        # Another process held the lock: use its result if it finished after we started
+        if (
+            waited
+            and result_path.exists()
+            and result_path.stat().st_mtime_ns >= started
+        ):
+            return pickle.loads(result_path.read_bytes())
+        result = compute()
+        # Uncontended queries are not written to disk
+        if not _try_lock(lock, WAITING):
+            temp = directory / f"{key}.{threading.get_ident()}.tmp"
+            temp.write_bytes(pickle.dumps(result))
+            temp.replace(result_path)
+    # Closing the lock file released the lock
+    if random.random() < 0.01:
+        purge_files(directory)
+    return result
+
+
+def _try_lock(file, start, length=1):
+    """Lock bytes of file without blocking; False if another process holds them."""
+    try:
+        fcntl.lockf(file, fcntl.LOCK_EX | fcntl.LOCK_NB, length, start)
+    except OSError as e:
+        if e.errno not in (errno.EACCES, errno.EAGAIN):
+            raise
+        return False
+    return True
+
+
+def _is_current(file, path):
+    try:
+        return os.stat(path).st_ino == os.fstat(file.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def _lock_leader(path, deadline):
+    """
+    Open the lock file at path and lock its LEADER byte. Return the file and whether
+    another process held the byte first, or None for the file at the deadline.
+    """
+    waited = False
+    while True:
+        # Readable as well: a shared lock needs a file open for reading
+        lock = open(path, "a+")
+        try:
+            waiting = False
+            while not _try_lock(lock, LEADER):
+                if not waiting:
+                    # Only blocks while a leader checks for waiting processes
+                    fcntl.lockf(lock, fcntl.LOCK_SH, 1, WAITING)
+                    waiting = waited = True
+                if time.monotonic() > deadline:
+                    lock.close()
+                    return None, waited
+                time.sleep(POLL_INTERVAL)
+            # purge_files() may have removed the file before it was locked
+            if _is_current(lock, path):
+                return lock, waited
+        except BaseException:
+            lock.close()
+            raise
+        lock.close()
+
+
+def purge_files(directory):
+    """Remove results and unused lock files created over RESULT_TTL seconds ago."""
+    expiry = time.time() - RESULT_TTL
+    for path in directory.glob("*.result"):
+        try:
+            if path.stat().st_mtime < expiry:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+    for path in directory.glob("*.lock"):
+        # Closing a file releases all of this process's locks on it, so keys in flight
+        # here are left alone
+        with _inflight_lock:
+            if path.stem in _inflight:
+                continue
+            try:
+                if path.stat().st_mtime >= expiry:
+                    continue
+                with open(path, "a+") as lock:
+                    # Locking the whole file checks that no process leads or waits
+                    if _try_lock(lock, 0, 0) and _is_current(lock, path):
+                        path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class CoalescedQuerySetMixin:
+    """QuerySet mixin sharing count() and the rows with identical concurrent queries."""
+
+    def query_key(self, kind):
+        try:
+            sql, params = self.query.get_compiler(self.db).as_sql()
+        except EmptyResultSet:
+            return None
+        parts = (
+            kind,
+            self.db,
+            self._iterable_class.__name__,
+            self._fields,
+            sql,
+            params,
+        )
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def shared(self, kind, compute):
+        # Uncommitted writes of this request's transaction must not be shared
+        key = None if connections[self.db].in_atomic_block else self.query_key(kind)
+        if key is None:
+            return compute()
+        return single_flight(key, compute)
+
+    def count(self):
+        if self._result_cache is not None:
+            return len(self._result_cache)
+        return self.shared("count", super().count)
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            self._result_cache = self.shared(
+                "rows", lambda: list(self._iterable_class(self))
+            )
+        if self._prefetch_related_lookups and not self._prefetch_done:
+            self._prefetch_related_objects()
+
+
+@functools.cache
+def coalesced_class(queryset_class):
+    return type(
+        f"Coalesced{queryset_class.__name__}",
+        (CoalescedQuerySetMixin, queryset_class),
+        {},
+    )
+
+
+def coalesced(queryset):
+    """Return a copy of queryset that coalesces its count and rows, as do its clones."""
+    queryset = queryset._chain()
+    queryset.__class__ = coalesced_class(type(queryset))
+    return queryset
+
+
+class CoalesceMixin:
+    """
+    Use with a TableauxView to coalesce the table queries of identical concurrent GET
+    requests. Exports are not coalesced since their results can be large.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != "GET" or "_export" in self.request.GET:
+            return queryset
+        return coalesced(queryset)
@@ -0,0 +1,270 @@
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+from django.utils.module_loading import import_string
+from django_tables2.export.export import TableExport
+from tablib import Dataset
+
+# Background table exports. A job splits the ordered ids of the rows to export into
+# chunks, builds each chunk's values in a process pool and merges the parts into the
+# final file. Job state is kept in <EXPORT_DIR>/<job_id>/job.json so any worker process
+# on the host can report progress. Job directories expire after EXPORT_EXPIRY seconds.
+# The thread running a job rewrites job.json at least every HEARTBEAT_SECONDS, so a job
+# left active by a process that died is reported failed once it stops being updated.
+
+CHUNK_SIZE = 5000
+ACTIVE_STATES = ("queued", "running", "merging")
+HEARTBEAT_SECONDS = 30
+STALE_SECONDS = 5 * HEARTBEAT_SECONDS
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def export_dir():
+    return Path(getattr(settings, "EXPORT_DIR", settings.BASE_DIR / "exports"))
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, "EXPORT_WORKERS", None),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(os.environ["DJANGO_SETTINGS_MODULE"],),
+            )
+        return _pool
+
+
+def table_reference(table_class):
+    """Return what a pool process needs to import table_class: path and breakpoint."""
+    # Breakpoint variants (movies/responsive.py) share the import path of their table
+    table_path = f"{table_class.__module__}.{table_class.__qualname__}"
+    return table_path, getattr(table_class, "breakpoint", None)
+
+
+def import_table(reference):
+    table_path, breakpoint = reference
+    table_class = import_string(table_path)
+    return table_class.variants[breakpoint] if breakpoint else table_class
+
+
+def build_chunk(job_path, index, table_ref, ids, exclude_columns):
+    """Runs in a pool process: write the values of the rows in ids, in that order."""
+    table_class = import_table(table_ref)
+    records = table_class._meta.model._default_manager.in_bulk(ids)
+    table = table_class([records[pk] for pk in ids if pk in records])
+    values = table.as_values(exclude_columns=exclude_columns)
+    headers = next(values)
+    part = Path(job_path) / f"part-{index:05}.pickle"
+    with part.open("wb") as f:
+        pickle.dump((headers, list(values)), f)
+    return str(part)
+
+
+def merge_parts(job_path, parts, export_format, filename):
+    """Runs in a pool process: combine the chunk parts into the export file."""
+    dataset = None
+    for part in parts:
+        with open(part, "rb") as f:
+            headers, rows = pickle.load(f)
+        if dataset is None:
+            dataset = Dataset(headers=headers)
+        dataset.extend(rows)
+        os.remove(part)
+    data = dataset.export(export_format)
+    output = Path(job_path) / filename
+    output.write_bytes(data if isinstance(data, bytes) else data.encode())
+    return output.stat().st_size
+
+
+def _job_path(job_id):
+    return export_dir() / job_id
+
+
+def _write_job(job):
+    job["updated"] = time.time()
+    path = _job_path(job["id"]) / "job.json"
+    temp = path.with_suffix(".tmp")
+    temp.write_text(json.dumps(job))
+    temp.replace(path)
+
+
+def read_job(job_id):
+    try:
+        uuid.UUID(hex=job_id)
+        job = json.loads((_job_path(job_id) / "job.json").read_text())
+    except (ValueError, OSError):
+        return None
+    updated = job.get("updated", job["created"])
+    if job["state"] in ACTIVE_STATES and updated < time.time() - STALE_SECONDS:
+        job["state"] = "failed"
+        job["error"] = "The export stopped before it finished"
+    return job
+
+
+def purge_expired():
+    directory = export_dir()
+    if not directory.exists():
+        return
+    expiry = time.time() - getattr(settings, "EXPORT_EXPIRY", 3600)
+    for path in directory.iterdir():
+        if path.is_dir() and path.stat().st_mtime < expiry:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def start_export(request, table_class, ids, exclude_columns, export_format, filename):
+    """Queue an export of the rows with the given ids, in order; return the job id."""
+    purge_expired()
+    if request.session.session_key is None:
+        request.session.save()
+    chunks = [ids[i : i + CHUNK_SIZE] for i in range(0, len(ids), CHUNK_SIZE)] or [[]]
+    job = {
+        "id": uuid.uuid4().hex,
+        "session": request.session.session_key,
+        "state": "queued",
+        "format": export_format,
+        "filename": f"{filename}.{export_format}",
+        "rows": len(ids),
+        "chunks": len(chunks),
+        "done": 0,
+        "created": time.time(),
+        "error": "",
+    }
+    _job_path(job["id"]).mkdir(parents=True)
+    _write_job(job)
+    table_ref = table_reference(table_class)
+    threading.Thread(
+        target=_run_job, args=(job, table_ref, chunks, exclude_columns), daemon=True
+    ).start()
+    return job["id"]
+
+
+def _completed(job, futures):
+    """Yield futures as they complete, rewriting job while none does."""
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, HEARTBEAT_SECONDS, return_when=FIRST_COMPLETED)
+        if not done:
+            _write_job(job)
+        yield from done
+
+
+def _run_job(job, table_ref, chunks, exclude_columns):
+    job_path = str(_job_path(job["id"]))
+    try:
+        pool = get_pool()
+        futures = {
+            pool.submit(build_chunk, job_path, i, table_ref, chunk, exclude_columns): i
+            for i, chunk in enumerate(chunks)
+        }
+        job["state"] = "running"
+        _write_job(job)
+        parts = [None] * len(chunks)
+        for future in _completed(job, futures):
+            parts[futures[future]] = future.result()
+            job["done"] += 1
+            _write_job(job)
+        job["state"] = "merging"
+        _write_job(job)
+        merge = pool.submit(
+            merge_parts, job_path, parts, job["format"], job["filename"]
+        )
+        for future in _completed(job, [merge]):
+            job["size"] = future.result()
+        job["state"] = "finished"
+    except Exception as e:
+        job["state"] = "failed"
+        job["error"] = str(e)
+    _write_job(job)
+
+
+class BackgroundExportMixin:
+    """
+    Use with a TableauxView to run exports in background_export_formats, or of at least
+    background_export_rows rows, as a background job with a progress page.
+    """
+
+    background_export_formats = ("xlsx",)
+    background_export_rows = 10000
+
+    def export_table(self):
+        from django_tableaux.table import build_table
+
+        export_format = self.request.GET.get("_export", self.export_format)
+        self.get_filtered_object_list()
+        if self.request.GET.get("_subset") == "selected":
+            ids = self.request.session.get("selected_ids", [])
+            self.object_list = self.object_list.filter(id__in=ids)
+        if (
+            export_format not in self.background_export_formats
+            and self.object_list.count() < self.background_export_rows
+        ):
+            return super().export_table()
+        if not TableExport.is_valid_format(export_format):
+            raise Http404(f"Export format '{export_format}' is not supported")
+        table = build_table(self, prefix=self.prefix)
+        exclude_columns = [k for k, v in table.columns.columns.items() if not v.visible]
+        exclude_columns.append("selection")
+        # The table has applied the current sort order to its queryset
+        ids = list(table.data.data.values_list("pk", flat=True))
+        job_id = start_export(
+            self.request,
+            type(table),
+            ids,
+            exclude_columns,
+            export_format,
+            self.export_filename,
+        )
+        context = {
+            "job": read_job(job_id),
+            "active": True,
+            "return_url": self.request.path,
+        }
+        return render(self.request, "movies/export_progress.html", context)
+
+
+def _job_for_request(request, job_id):
+    job = read_job(job_id)
+    if job is None or job["session"] != request.session.session_key:
+        raise Http404("Export not found")
+    return job
+
+
+def export_status(request, job_id):
+    job = _job_for_request(request, job_id)
+    context = {"job": job, "active": job["state"] in ACTIVE_STATES}
+    return render(request, "movies/export_status.html", context)
+
+
+def export_download(request, job_id):
+    job = _job_for_request(request, job_id)
+    if job["state"] != "finished":
+        raise Http404("Export is not ready")
+    path = _job_path(job_id) / job["filename"]
+    return FileResponse(
+        path.open("rb"),
+        as_attachment=True,
+        filename=job["filename"],
+        content_type=TableExport.FORMATS[job["format"]],
+    )
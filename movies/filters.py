@@ -5,21 +5,45 @@ from django_filters import (
     FilterSet,
     ModelChoiceFilter,
     RangeFilter,
-    NumberFilter,
 )
-from django_filters.widgets import DateRangeWidget
+from django_filters.widgets import DateRangeWidget, RangeWidget
 from django import forms
+from django.urls import reverse_lazy
 from django_flatpickr.widgets import DatePickerInput
 
 from movies.models import Movie
 
 
+def histogram_range_filter(field_name):
+    """A min/max filter drawn as a slider over the field's histogram (histograms.py)."""
+    widget = RangeWidget(
+        attrs={
+            "data-histogram-field": field_name,
+            "data-histogram-url": reverse_lazy("histograms"),
+        }
+    )
+    return RangeFilter(field_name=field_name, widget=widget)
+
+
 class MovieFilter(FilterSet):
     class Meta:
         model = Movie
         fields = ["title"]
 
-    title = CharFilter(field_name="title", lookup_expr="icontains")
-    budget = NumberFilter(field_name="budget", lookup_expr="gt")
+    title = CharFilter(
+        field_name="title",
+        lookup_expr="icontains",
+        widget=forms.TextInput(
+            attrs={
+                "data-autocomplete-url": reverse_lazy("title_autocomplete"),
+                "autocomplete": "off",
+            }
+        ),
+    )
+    budget = histogram_range_filter("budget")
+    revenue = histogram_range_filter("revenue")
+    popularity = histogram_range_filter("popularity")
+    runtime = histogram_range_filter("runtime")
+    vote_average = histogram_range_filter("vote_average")
     release_date = DateFilter(field_name="release_date",lookup_expr="gte", widget=forms.DateInput(attrs={'type': 'date'}))
     #release_date = DateFilter(field_name="release_date",lookup_expr="gte", widget=DatePickerInput())
@@ -0,0 +1,146 @@
+from bisect import bisect_right
+
+from django.db import transaction
+from django.http import JsonResponse
+
+from . import versions
+from .models import Movie
+
+# Equi-depth histograms of the numeric Movie fields used by the range filters.
+# Bin edges are fixed when the histograms are built; counts are then adjusted on every
+# Movie write so the client can draw the distribution and estimate matches locally
+# without a COUNT query per slider step. The histograms cover the whole table, so the
+# estimates ignore the other active filters.
+# As for the title index (autocomplete.py), a version counter in the shared cache makes
+# the processes that did not write a Movie rebuild their histograms in the background.
+
+RANGE_FIELDS = ("budget", "revenue", "popularity", "runtime", "vote_average")
+BINS = 40
+VERSION_KEY = "movies:histograms:version"
+# Stored values of a saved movie that were not read because there were no histograms yet
+UNKNOWN = object()
+
+
+class Histogram:
+    def __init__(self, edges, counts):
+        self.edges = edges
+        self.counts = counts
+
+    @classmethod
+    def from_sorted(cls, values, bins=BINS):
+        """Build bins holding roughly equal numbers of the sorted values."""
+        if not values:
+            return cls([0.0, 0.0], [0])
+        step = max(len(values) / bins, 1)
+        edges = sorted(
+            {values[int(i * step)] for i in range(bins) if i * step < len(values)}
+        )
+        if edges[-1] < values[-1] or len(edges) == 1:
+            edges.append(values[-1])
+        histogram = cls(edges, [0] * (len(edges) - 1))
+        for value in values:
+            histogram.add(value)
+        return histogram
+
+    @property
+    def total(self):
+        return sum(self.counts)
+
+    def _bin(self, value):
+        return min(max(bisect_right(self.edges, value) - 1, 0), len(self.counts) - 1)
+
+    def add(self, value, delta=1):
+        if value is None:
+            return
+        value = float(value)
+        # Values outside the original range widen the end bins
+        if value < self.edges[0]:
+            self.edges[0] = value
+        elif value > self.edges[-1]:
+            self.edges[-1] = value
+        self.counts[self._bin(value)] += delta
+
+    def estimate(self, low=None, high=None):
+        """Estimate how many values lie in [low, high], interpolating partial bins."""
+        low = self.edges[0] if low is None else float(low)
+        high = self.edges[-1] if high is None else float(high)
+        count = 0.0
+        for i, n in enumerate(self.counts):
+            start, end = self.edges[i], self.edges[i + 1]
+            if end < low or start > high:
+                continue
+            if end == start:
+                count += n
+                continue
+            overlap = min(end, high) - max(start, low)
+            count += n * max(overlap, 0) / (end - start)
+        return round(count)
+
+    def as_dict(self):
+        return {"edges": self.edges, "counts": self.counts, "total": self.total}
+
+
+def _build():
+    histograms = {}
+    for field in RANGE_FIELDS:
+        values = (
+            Movie.objects.exclude(**{f"{field}__isnull": True})
+            .order_by(field)
+            .values_list(field, flat=True)
+        )
+        histograms[field] = Histogram.from_sorted([float(v) for v in values.iterator()])
+    return histograms
+
+
+_histograms = versions.VersionedState(VERSION_KEY, _build)
+
+
+def current_version():
+    return versions.current(VERSION_KEY)
+
+
+def invalidate():
+    """Make every process rebuild its histograms, after writes that skip the signals."""
+    return versions.bump(VERSION_KEY)
+
+
+def get_histograms():
+    return _histograms.get()
+
+
+def _changed(old_values, new_values):
+
+    def update(histograms):
+        for values, delta in ((old_values, -1), (new_values, 1)):
+            if values:
+                for field in RANGE_FIELDS:
+                    histograms[field].add(values.get(field), delta)
+
+    # Without the stored values the row cannot be moved between bins, so rebuild
+    _histograms.changed(None if old_values is UNKNOWN else update)
+
+
+def movie_saving(instance):
+    # Remember the stored values so post_save can move the row between bins
+    if instance.pk is not None:
+        instance._histogram_values = (
+            Movie.objects.filter(pk=instance.pk).values(*RANGE_FIELDS).first()
+            if _histograms.state is not None
+            else UNKNOWN
+        )
+
+
+def movie_saved(instance):
+    old_values = getattr(instance, "_histogram_values", None)
+    new_values = {field: getattr(instance, field) for field in RANGE_FIELDS}
+    instance._histogram_values = new_values
+    transaction.on_commit(lambda: _changed(old_values, new_values))
+
+
+def movie_deleted(instance):
+    old_values = {field: getattr(instance, field) for field in RANGE_FIELDS}
+    transaction.on_commit(lambda: _changed(old_values, None))
+
+
+def histograms(request):
+    return JsonResponse({field: h.as_dict() for field, h in get_histograms().items()})
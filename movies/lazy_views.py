@@ -0,0 +1,45 @@
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+
+class LazyView:
+    """
+    URL callback that imports a view the first time its route is used, so table,
+    filter and form modules are not loaded when a worker boots.
+    Usage: path("", lazy_view("movies.views.BasicView"), name="basic")
+    Class-based views are built with as_view(**initkwargs); functions are used as is.
+    """
+
+    def __init__(self, dotted_path, **initkwargs):
+        self.dotted_path = dotted_path
+        self.initkwargs = initkwargs
+        # Used by URLPattern.lookup_str so reverse() does not trigger the import
+        self.__module__, self.__name__ = dotted_path.rsplit(".", 1)
+        self.__qualname__ = self.__name__
+
+    @cached_property
+    def view(self):
+        view = import_string(self.dotted_path)
+        if hasattr(view, "as_view"):
+            return view.as_view(**self.initkwargs)
+        return view
+
+    def load(self):
+        return self.view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+    def __repr__(self):
+        return f"<LazyView: {self.dotted_path}>"
+
+
+def lazy_view(dotted_path, **initkwargs):
+    return LazyView(dotted_path, **initkwargs)
+
+
+def view_class(callback):
+    """Return the view class behind a URL callback, loading it if necessary."""
+    if isinstance(callback, LazyView):
+        callback = callback.load()
+    return getattr(callback, "view_class", None)
@@ -0,0 +1,159 @@
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import F
+
+from movies.models import Movie
+
+PAGE_SIZE = 20
+
+
+def _settings(template, name):
+    return {
+        **template,
+        "NAME": name,
+        "OPTIONS": {**template.get("OPTIONS", {})},
+        "TEST": {},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures concurrent table page reads against the default SQLite setup and the "
+        "production profile (settings.SQLITE_PRODUCTION), with a writer running "
+        "alongside"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=20000, help="Movies in the test database"
+        )
+        parser.add_argument("--threads", type=int, default=4, help="Concurrent readers")
+        parser.add_argument(
+            "--seconds", type=float, default=5, help="Duration of each run"
+        )
+        parser.add_argument(
+            "--no-writer", action="store_true", help="Run the readers only"
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        directory = Path(tempfile.mkdtemp(prefix="benchmark_db"))
+        try:
+            plain = str(directory / "plain.sqlite3")
+            pooled = str(directory / "pooled.sqlite3")
+            default = {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {}}
+            profile = settings.SQLITE_PRODUCTION
+            aliases = {
+                "benchmark_plain": _settings(default, plain),
+                "benchmark_read": _settings(profile["read"], pooled),
+                "benchmark_write": _settings(profile["default"], pooled),
+            }
+            configured = connections.configure_settings(
+                {**connections.settings, **aliases}
+            )
+            connections.settings.update({alias: configured[alias] for alias in aliases})
+
+            self.create_database("benchmark_plain", options["rows"])
+            connections["benchmark_plain"].close()
+            shutil.copyfile(plain, pooled)
+
+            results = {
+                "default": self.run("benchmark_plain", "benchmark_plain"),
+                "production": self.run("benchmark_read", "benchmark_write"),
+            }
+        finally:
+            for alias in ("benchmark_plain", "benchmark_read", "benchmark_write"):
+                if alias in connections.settings:
+                    connections[alias].close()
+            shutil.rmtree(directory, ignore_errors=True)
+
+        for name, (reads, writes, errors) in results.items():
+            self.stdout.write(
+                f"{name:>10}: {reads / options['seconds']:8.0f} page reads/s, "
+                f"{writes / options['seconds']:6.0f} writes/s, {errors} errors"
+            )
+        speedup = results["production"][0] / (results["default"][0] or 1)
+        self.stdout.write(self.style.SUCCESS(f"Read throughput x{speedup:.2f}"))
+
+    def create_database(self, alias, rows):
+        with connections[alias].schema_editor() as editor:
+            editor.create_model(Movie)
+        start = date(1950, 1, 1)
+        Movie.objects.using(alias).bulk_create(
+            (
+                Movie(
+                    title=f"Movie {i:06}",
+                    budget=i * 1000,
+                    revenue=i * 2500,
+                    runtime=80 + i % 90,
+                    release_date=start + timedelta(days=i % 25000),
+                    vote_average=i % 10,
+                    vote_count=i,
+                )
+                for i in range(1, rows + 1)
+            ),
+            batch_size=1000,
+        )
+
+    def run(self, read_alias, write_alias):
+        """Return the page reads, writes and errors of a run."""
+        stop = threading.Event()
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        pages = max(self.options["rows"] // PAGE_SIZE, 1)
+
+        def request(work, counter):
+            # One request: its queries, then the connection is closed as at its end
+            try:
+                work()
+                with lock:
+                    counts[counter] += 1
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+            finally:
+                connections[read_alias].close()
+                connections[write_alias].close()
+
+        def read_page():
+            rows = Movie.objects.using(read_alias).order_by("title")
+            offset = random.randrange(pages) * PAGE_SIZE
+            list(rows.values_list("id", "title", "budget")[offset : offset + PAGE_SIZE])
+            rows.count()
+
+        def write():
+            with transaction.atomic(using=write_alias):
+                Movie.objects.using(write_alias).filter(
+                    pk=random.randint(1, self.options["rows"])
+                ).update(vote_count=F("vote_count") + 1)
+
+        def reader():
+            while not stop.is_set():
+                request(read_page, "reads")
+
+        def writer():
+            while not stop.is_set():
+                request(write, "writes")
+                time.sleep(0.005)
+
+        threads = [
+            threading.Thread(target=reader) for _ in range(self.options["threads"])
+        ]
+        if not self.options["no_writer"]:
+            threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(self.options["seconds"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return counts["reads"], counts["writes"], counts["errors"]
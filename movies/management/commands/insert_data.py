@@ -6,6 +6,7 @@ from django.conf import settings
 from django.db import connections
 from django.db.utils import OperationalError
 from django.apps import apps
+from movies.signals import movies_bulk_written
 
 
 class Command(BaseCommand):
@@ -38,6 +39,7 @@ class Command(BaseCommand):
         try:
             cursor.executescript(sql_script)
             connection.commit()  # Commit the transaction
+            movies_bulk_written()
             self.stdout.write(self.style.SUCCESS(f"SQL script '{sql_script_path}' executed successfully"))
         except Exception as e:
             self.stderr.write(f"Error executing SQL script: {e}")
@@ -0,0 +1,80 @@
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# A cold worker is simulated by a fresh interpreter that sets up Django and loads the
+# URLconf. Lazily routed views are only imported when --load-views is given.
+BOOT_SCRIPT = """
+import django
+django.setup()
+from django.urls import get_resolver
+patterns = get_resolver().url_patterns
+if {load_views}:
+    from movies.lazy_views import LazyView
+    for pattern in patterns:
+        if isinstance(pattern.callback, LazyView):
+            # importtime does not report modules loaded by import_module
+            __import__(pattern.callback.__module__)
+            pattern.callback.load()
+"""
+
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the import time of each module when a worker boots "
+        "(python -X importtime)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=25, help="Number of modules to list"
+        )
+        parser.add_argument(
+            "--sort",
+            choices=["cumulative", "self"],
+            default="cumulative",
+            help="Sort by time including or excluding nested imports",
+        )
+        parser.add_argument(
+            "--load-views",
+            action="store_true",
+            help="Also import every lazily routed view, as after the first requests",
+        )
+
+    def handle(self, *args, **options):
+        script = BOOT_SCRIPT.format(load_views=options["load_views"])
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+
+        modules = []
+        total = 0
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME.match(line)
+            if not match:
+                continue
+            own, cumulative, indent, name = match.groups()
+            modules.append((name, int(own), int(cumulative)))
+            if not indent:
+                total += int(cumulative)
+
+        index = 1 if options["sort"] == "self" else 2
+        modules.sort(key=lambda m: m[index], reverse=True)
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for name, own, cumulative in modules[: options["limit"]]:
+            self.stdout.write(f"{cumulative / 1000:14.1f} {own / 1000:9.1f}  {name}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(modules)} modules imported in {total / 1000:.1f} ms"
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from movies import rollups
+from movies.models import MovieRollup
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per year and per month movie rollups from the movies table"
+
+    def handle(self, *args, **options):
+        rollups.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"{MovieRollup.objects.count()} rollup rows written")
+        )
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import re
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from movies.models import Movie
+from movies.signals import movies_bulk_written
+
+# A token of an SQL dump: whitespace, a comment, a quoted string, punctuation or a
+# bare word. A quoted string cannot be followed by a quote, so a string cut by the end
+# of a chunk between the quotes of an escaped '' does not match until more is read.
+TOKEN = re.compile(
+    r"\s+|--[^\n]*|/\*.*?\*/|'[^']*(?:''[^']*)*'(?!')|[(),;]|(?!--|/\*)[^\s(),;']+",
+    re.S,
+)
+CHUNK_SIZE = 1 << 16
+
+
+def tokens(file):
+    """Yield the SQL tokens of file, read in chunks, without whitespace or comments."""
+    buffer = ""
+    while True:
+        chunk = file.read(CHUNK_SIZE)
+        buffer += chunk
+        pos = 0
+        while True:
+            match = TOKEN.match(buffer, pos)
+            # A token at the end of the buffer may continue in the next chunk
+            if match is None or (chunk and match.end() == len(buffer)):
+                break
+            pos = match.end()
+            token = match.group()
+            if not token.isspace() and not token.startswith(("--", "/*")):
+                yield token
+        buffer = buffer[pos:]
+        if not chunk:
+            if buffer.strip():
+                raise CommandError(f"Unexpected end of dump near: {buffer[:50]!r}")
+            return
+
+
+def _expect(stream, expected):
+    token = next(stream, None)
+    if token is None or token.upper() != expected:
+        raise CommandError(f"Expected {expected!r} in dump, found {token!r}")
+
+
+def _literal(token):
+    if token.startswith("'"):
+        return token[1:-1].replace("''", "'")
+    if token.upper() == "NULL":
+        return None
+    return token
+
+
+def _group(stream):
+    """Read a parenthesized, comma separated list of tokens."""
+    _expect(stream, "(")
+    items = []
+    for token in stream:
+        if token == ")":
+            return items
+        if token != ",":
+            items.append(token)
+    raise CommandError("Unexpected end of dump inside parentheses")
+
+
+def dump_rows(file, table):
+    """Yield a dict of column: value for every row inserted into table by the dump."""
+    stream = tokens(file)
+    for token in stream:
+        if token.upper() != "INSERT":
+            continue
+        _expect(stream, "INTO")
+        name = next(stream, "").strip('`"')
+        columns = [column.strip('`"') for column in _group(stream)]
+        _expect(stream, "VALUES")
+        while True:
+            values = [_literal(token) for token in _group(stream)]
+            if name == table:
+                yield dict(zip(columns, values))
+            separator = next(stream, ";")
+            if separator == ";":
+                break
+            if separator != ",":
+                raise CommandError(
+                    f"Expected ',' or ';' after a row, found {separator!r}"
+                )
+
+
+def row_hash(values):
+    return hashlib.blake2b(
+        json.dumps(values, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Synchronises the movies table with an SQL dump in the format of "
+        "insert_data.sql, writing only the rows that were added, changed or removed "
+        "since the last sync"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", help="Dump to read (default: the app's insert_data.sql)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows per upsert statement"
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the changes without writing them",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or os.path.join(
+            apps.get_app_config("movies").path, "insert_data.sql"
+        )
+        if not os.path.exists(path):
+            raise CommandError(f"The file '{path}' does not exist.")
+        self.batch_size = options["batch_size"]
+        self.dry_run = options["dry_run"]
+        self.fields = {field.column: field for field in Movie._meta.concrete_fields}
+        self.update_fields = {"content_hash"}
+        self.counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+        with transaction.atomic():
+            self.sync(path)
+        if not self.dry_run and any(
+            self.counts[k] for k in ("inserted", "updated", "deleted")
+        ):
+            # bulk_create skips the signals that keep the rollups and indexes current
+            movies_bulk_written()
+
+        summary = ", ".join(f"{count} {name}" for name, count in self.counts.items())
+        prefix = "Dry run: " if self.dry_run else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{summary}"))
+
+    def sync(self, path):
+        stored = dict(Movie.objects.values_list("id", "content_hash"))
+        seen = set()
+        batch = []
+        with open(path, encoding="utf-8") as file:
+            for values in dump_rows(file, Movie._meta.db_table):
+                movie = self.build_movie(values)
+                if movie.id in seen:
+                    raise CommandError(
+                        f"Row {movie.id} appears more than once in the dump"
+                    )
+                seen.add(movie.id)
+                old_hash = stored.get(movie.id)
+                if old_hash == movie.content_hash:
+                    self.counts["unchanged"] += 1
+                    continue
+                self.counts["inserted" if old_hash is None else "updated"] += 1
+                batch.append(movie)
+                if len(batch) >= self.batch_size:
+                    self.upsert(batch)
+                    batch = []
+        self.upsert(batch)
+
+        missing = sorted(stored.keys() - seen)
+        self.counts["deleted"] = len(missing)
+        if self.dry_run:
+            return
+        for i in range(0, len(missing), self.batch_size):
+            Movie.objects.filter(id__in=missing[i : i + self.batch_size]).delete()
+
+    def build_movie(self, values):
+        unknown = values.keys() - self.fields.keys()
+        if unknown:
+            raise CommandError(f"Unknown columns in dump: {', '.join(sorted(unknown))}")
+        try:
+            attrs = {
+                self.fields[column].attname: self.fields[column].to_python(value)
+                for column, value in values.items()
+            }
+        except Exception as e:
+            raise CommandError(f"Invalid row {values.get('id')}: {e}")
+        # Only the columns in the dump are written so others keep their values on update
+        self.update_fields.update(name for name in attrs if name != "id")
+        return Movie(content_hash=row_hash(values), **attrs)
+
+    def upsert(self, batch):
+        if not batch or self.dry_run:
+            return
+        Movie.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=sorted(self.update_fields),
+        )
@@ -1,8 +1,62 @@
 from django.db import models
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Concat
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
 
+# SQL equivalents of the Movie properties, used for values mode table rows
+HAS_FINANCIALS = Q(budget__gt=0) & Q(revenue__gt=0)
+PROFIT = F('revenue') - F('budget')
+HOURS = Cast(F('runtime') / 60, models.CharField())
+MINUTES = Cast(F('runtime') - F('runtime') / 60 * 60, models.CharField())
+DERIVED_FIELDS = {
+    'profit': Case(
+        When(HAS_FINANCIALS, then=PROFIT),
+        default=None,
+        output_field=models.BigIntegerField(),
+    ),
+    'profit_margin': Case(
+        When(
+            HAS_FINANCIALS,
+            # Same order of operations as the property, so the floats round alike
+            then=PROFIT / Cast('budget', FloatField()) * Value(100.0),
+        ),
+        default=None,
+        output_field=FloatField(),
+    ),
+    'runtime_formatted': Case(
+        When(Q(runtime__isnull=True) | Q(runtime=0), then=None),
+        When(runtime__gte=60, then=Concat(HOURS, Value('h '), MINUTES, Value('m'))),
+        default=Concat(Cast('runtime', models.CharField()), Value('m')),
+        output_field=models.CharField(),
+    ),
+    'is_released': Case(
+        When(movie_status='Released', then=True),
+        default=False,
+        output_field=models.BooleanField(),
+    ),
+    'is_successful': Case(
+        When(HAS_FINANCIALS & Q(revenue__gt=F('budget')), then=True),
+        When(HAS_FINANCIALS, then=False),
+        default=None,
+        output_field=models.BooleanField(),
+    ),
+}
+
+
+class MovieQuerySet(models.QuerySet):
+    def table_rows(self, *fields):
+        """
+        Return compact named tuples with just the given fields, not model instances.
+        Names in DERIVED_FIELDS are computed by the database rather than in Python.
+        """
+        derived = {
+            name: DERIVED_FIELDS[name] for name in fields if name in DERIVED_FIELDS
+        }
+        return self.annotate(**derived).values_list(*fields, named=True)
+
+
 class Movie(models.Model):
     """
     Movie model representing film data with comprehensive metadata.
@@ -94,6 +148,19 @@ class Movie(models.Model):
         blank=True,
         help_text="Official movie website URL"
     )
+
+    # Upstream synchronisation
+    content_hash = models.CharField(
+        max_length=32,
+        blank=True,
+        default='',
+        # Also the column default, for rows inserted by raw SQL such as insert_data
+        db_default='',
+        editable=False,
+        help_text="Hash of the row in the last synced dump"
+    )
+
+    objects = MovieQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Movie"
@@ -163,7 +230,8 @@ class Movie(models.Model):
     @property
     def is_successful(self):
         """Check if the movie was financially successful (profit > 0)."""
-        return self.profit and self.profit > 0
+        profit = self.profit
+        return None if profit is None else profit > 0
 
     def get_absolute_url(self):
         """Get the absolute URL for this movie."""
@@ -186,3 +254,65 @@ class Movie(models.Model):
             raise ValidationError({
                 'vote_count': 'Vote count is required when vote average is provided.'
             })
+
+
+class TablePreference(models.Model):
+    """
+    Table view settings chosen by a user, or by an anonymous session, for one view.
+    Read through movies.preferences rather than directly.
+    """
+    owner = models.CharField(
+        max_length=100,
+        help_text="'user:<pk>' or 'session:<session key>'"
+    )
+    view_name = models.CharField(
+        max_length=100,
+        help_text="URL name of the table view"
+    )
+    settings = models.JSONField(default=dict)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner', 'view_name'], name='unique_table_preference'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.owner} {self.view_name}"
+
+
+class MovieRollup(models.Model):
+    """
+    Movie count and budget, revenue and rating totals for one release month and status.
+    Rows with month 0 hold the totals for the whole year. Maintained by movies.rollups.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField(help_text="1-12, or 0 for the whole year")
+    movie_status = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        choices=Movie.movie_status.field.choices,
+    )
+    movie_count = models.PositiveIntegerField(default=0)
+    # Averages are sum / count, counting only the movies that have a value
+    budget_count = models.PositiveIntegerField(default=0)
+    budget_sum = models.BigIntegerField(default=0)
+    revenue_count = models.PositiveIntegerField(default=0)
+    revenue_sum = models.BigIntegerField(default=0)
+    vote_average_count = models.PositiveIntegerField(default=0)
+    vote_average_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['year', 'month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['year', 'month', 'movie_status'], name='unique_movie_rollup'
+            ),
+        ]
+
+    def __str__(self):
+        period = f"{self.year}-{self.month:02}" if self.month else str(self.year)
+        return f"{period} {self.movie_status}".strip()
@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from django.core.cache import cache
+from django_tableaux.models import ClickAction, FilterStyle, Pagination
+
+from . import versions
+from .models import TablePreference
+
+# Per user, per view table settings (the BasicSettingsForm fields: row and column
+# settings menus, pagination, filter style...). Reads are served from an in-process
+# LRU of resolved TablePreferences; writes go to the TablePreference table and bump a
+# version in the shared cache (movies/versions.py), so the other processes reload on
+# their next read.
+
+CACHE_SIZE = 1024
+
+
+def _height(value):
+    return int(value or 0)
+
+
+# Settings stored as strings that resolve to a TableauxView attribute
+CHOICES = {
+    "pagination": ("pagination", Pagination),
+    "filter_style": ("filter_style", FilterStyle),
+    "click_action": ("click_action", ClickAction),
+    "fixed_height": ("fixed_height", _height),
+}
+
+
+@dataclass(frozen=True)
+class TablePreferences:
+    data: MappingProxyType
+    attrs: tuple
+
+    @classmethod
+    def resolve(cls, data):
+        attrs = []
+        for k, v in data.items():
+            if isinstance(v, bool):
+                attrs.append((k, v))
+            elif k in CHOICES:
+                name, convert = CHOICES[k]
+                attrs.append((name, convert(v)))
+        return cls(MappingProxyType(dict(data)), tuple(attrs))
+
+    def apply(self, view):
+        for name, value in self.attrs:
+            setattr(view, name, value)
+
+
+EMPTY = TablePreferences.resolve({})
+
+
+def owner(request):
+    # The key comes from the session cookie. Without one the user is anonymous and has
+    # nothing saved, which is known without loading the session to check the user.
+    session_key = request.session.session_key
+    if session_key is None:
+        return None
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"session:{session_key}"
+
+
+def _version_key(key):
+    return f"table_preference:{key[0]}:{key[1]}"
+
+
+class PreferenceStore:
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, request, view_name):
+        """Return the TablePreferences of the request's user for view_name."""
+        who = owner(request)
+        if who is None or view_name is None:
+            return EMPTY
+        key = (who, view_name)
+        version = cache.get(_version_key(key), 0)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                return entry[1]
+        data = (
+            TablePreference.objects.filter(owner=who, view_name=view_name)
+            .values_list("settings", flat=True)
+            .first()
+        )
+        preferences = TablePreferences.resolve(data or {})
+        self._remember(key, version, preferences)
+        return preferences
+
+    def set(self, request, view_name, data):
+        """Save data for view_name and return the new TablePreferences."""
+        if not request.user.is_authenticated and request.session.session_key is None:
+            request.session.save()
+        key = (owner(request), view_name)
+        preferences = TablePreferences.resolve(data)
+        TablePreference.objects.update_or_create(
+            owner=key[0], view_name=view_name, defaults={"settings": dict(data)}
+        )
+        version = versions.bump(_version_key(key))
+        self._remember(key, version, preferences)
+        return preferences
+
+    def _remember(self, key, version, preferences):
+        with self.lock:
+            self.entries[key] = (version, preferences)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+store = PreferenceStore()
+
+
+class PreferencesMixin:
+    """Use with a TableauxView to apply the user's saved settings for the view."""
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.preferences = store.get(request, self.preference_name())
+        self.preferences.apply(self)
+
+    def preference_name(self):
+        match = self.request.resolver_match
+        return match.url_name if match else None
@@ -0,0 +1,183 @@
+import cProfile
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+from django.urls import Resolver404, resolve
+
+from .lazy_views import view_class
+
+# On-demand profiling of table views. A staff user sends the X-Profile header (or the
+# _profile query parameter) and the request is run under cProfile plus a stack
+# sampler. Each profile is saved as <name>.pstats, <name>.collapsed and <name>.json
+# in PROFILE_DIR.
+
+SAMPLE_INTERVAL = 0.001
+# htmx headers that put the request's URL in the address bar
+PUSH_HEADERS = ("HX-Push-Url", "HX-Replace-Url")
+
+# Only one profiler can be active in a process; on Python 3.12+ enabling a second one
+# raises ValueError. Profiled requests are therefore handled one at a time.
+_profile_lock = threading.Lock()
+
+
+def profile_dir():
+    return Path(getattr(settings, "PROFILE_DIR", settings.BASE_DIR / "profiles"))
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of one thread at a fixed interval and counts collapsed stacks
+    in the 'outer;inner count' format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def save_profile(request, response, profiler, sampler, duration):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    started = datetime.now(timezone.utc)
+    name = f"{started:%Y%m%d-%H%M%S-%f}"
+    profiler.dump_stats(directory / f"{name}.pstats")
+    (directory / f"{name}.collapsed").write_text(sampler.collapsed())
+    meta = {
+        "name": name,
+        "created": started.isoformat(),
+        "release": getattr(settings, "RELEASE", ""),
+        "method": request.method,
+        "path": request.get_full_path(),
+        "htmx": bool(getattr(request, "htmx", False)),
+        "status": response.status_code,
+        "duration_ms": round(duration * 1000, 1),
+        "samples": sum(sampler.stacks.values()),
+    }
+    (directory / f"{name}.json").write_text(json.dumps(meta))
+    prune_profiles(directory, getattr(settings, "PROFILE_KEEP", 100))
+    return name
+
+
+def strip_profile_param(url):
+    """Remove the _profile parameter from url, so later requests are not profiled."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query = [(k, v) for k, v in query if k != "_profile"]
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+def prune_profiles(directory, keep):
+    for meta in sorted(directory.glob("*.json"), reverse=True)[keep:]:
+        for path in directory.glob(f"{meta.stem}.*"):
+            path.unlink(missing_ok=True)
+
+
+def recent_profiles(limit=100):
+    directory = profile_dir()
+    if not directory.exists():
+        return []
+    return [
+        json.loads(path.read_text())
+        for path in sorted(directory.glob("*.json"), reverse=True)[:limit]
+    ]
+
+
+class ProfilingMiddleware:
+    """Must come after AuthenticationMiddleware so request.user is available."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.profile_requested(request):
+            return self.get_response(request)
+        with _profile_lock:
+            profiler = cProfile.Profile()
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+                duration = time.perf_counter() - start
+                sampler.stop()
+        for header in PUSH_HEADERS:
+            if "_profile" in response.get(header, ""):
+                response[header] = strip_profile_param(response[header])
+        response["X-Profile-Id"] = save_profile(
+            request, response, profiler, sampler, duration
+        )
+        return response
+
+    @staticmethod
+    def profile_requested(request):
+        if "HTTP_X_PROFILE" not in request.META and "_profile" not in request.GET:
+            return False
+        user = getattr(request, "user", None)
+        if user is None or not user.is_staff:
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        # Imported here so that booting a worker does not load django_tableaux views
+        from django_tableaux.views import TableauxView
+
+        cls = view_class(match.func)
+        return cls is not None and issubclass(cls, TableauxView)
+
+
+@staff_member_required
+def profile_list(request):
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "profiles": recent_profiles(),
+    }
+    return render(request, "movies/profile_list.html", context)
+
+
+@staff_member_required
+def profile_download(request, name, kind):
+    if kind not in ("pstats", "collapsed"):
+        raise Http404("Unknown profile type")
+    path = profile_dir() / f"{Path(name).name}.{kind}"
+    if not path.exists():
+        raise Http404("Profile not found")
+    return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
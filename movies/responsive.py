@@ -0,0 +1,91 @@
+from django_tableaux.utils import resolve_breakpoint
+
+# Responsive tables compiled into one table class per breakpoint when the class is
+# created, instead of resolving Meta.responsive for every request. Each variant has:
+# - only the columns its breakpoint can show: the layout's fixed and default columns
+#   plus Meta.responsive_optional[bp], the ones users may add with the column settings
+#   (a breakpoint without an entry keeps every column);
+# - the breakpoint's attrs merged into Meta.attrs;
+# - a smaller values projection, as ValuesRowsMixin fetches only the variant's columns.
+# Variants keep the table's name, so saved column settings are shared with it, and its
+# import path: code that imports a table by path must pass the breakpoint along with it
+# (see movies/exports.py).
+
+
+def _merge_attrs(attrs, extra):
+    """Merge layout attrs, where a string is a class, into a copy of table attrs."""
+    merged = {
+        k: dict(v) if isinstance(v, dict) else v for k, v in (attrs or {}).items()
+    }
+    for section, value in (extra or {}).items():
+        if isinstance(value, str):
+            value = {"class": value}
+        current = merged.setdefault(section, {})
+        for name, item in value.items():
+            if name == "class" and current.get("class"):
+                # Classes already on the table are kept once, in their original place
+                item = " ".join(dict.fromkeys(f"{current['class']} {item}".split()))
+            current[name] = item
+    return merged
+
+
+def _variant(table_class, bp, layout):
+    meta = table_class.Meta
+    layout = dict(layout)
+    attrs = _merge_attrs(getattr(meta, "attrs", {}), layout.pop("attrs", None))
+    optional = getattr(meta, "responsive_optional", {})
+    columns = table_class.base_columns
+    meta_attrs = {"responsive": {bp: layout}, "attrs": attrs}
+    if bp in optional:
+        keep = {*layout.get("fixed", ()), *layout.get("default", ()), *optional[bp]}
+        meta_attrs["exclude"] = tuple(name for name in columns if name not in keep)
+        if hasattr(meta, "sequence"):
+            meta_attrs["sequence"] = tuple(
+                name for name in meta.sequence if name in keep or name == "..."
+            )
+    namespace = {
+        "Meta": type("Meta", (meta,), meta_attrs),
+        "breakpoint": bp,
+        "__module__": table_class.__module__,
+        "__qualname__": table_class.__qualname__,
+    }
+    return type(table_class)(table_class.__name__, (table_class,), namespace)
+
+
+class BreakpointVariants:
+    """
+    Table mixin. Builds cls.variants, a table class per breakpoint of Meta.responsive.
+    Views pick one with BreakpointVariantsMixin.
+    """
+
+    breakpoint = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.breakpoint is not None:
+            return
+        responsive = getattr(getattr(cls, "Meta", None), "responsive", None) or {}
+        cls.variants = {
+            bp: _variant(cls, bp, layout) for bp, layout in responsive.items()
+        }
+        cls.resolved_variants = {}
+
+    @classmethod
+    def variant_for(cls, bp_values, bp):
+        """Return the variant for breakpoint bp, falling back like Meta.responsive."""
+        key = (tuple(bp_values.items()), bp)
+        if key not in cls.resolved_variants:
+            cls.resolved_variants[key] = (
+                resolve_breakpoint(bp_values, cls.variants, bp) or cls
+            )
+        return cls.resolved_variants[key]
+
+
+class BreakpointVariantsMixin:
+    """TableauxView mixin that renders the table variant of the client's breakpoint."""
+
+    def get_table_class(self):
+        table_class = super().get_table_class()
+        if not self._bp or not getattr(table_class, "variants", None):
+            return table_class
+        return table_class.variant_for(self.get_breakpoint_values(), self._bp)
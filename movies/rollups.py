@@ -0,0 +1,131 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast, ExtractMonth, ExtractYear, NullIf
+
+from .models import Movie, MovieRollup
+
+# Per year and per month Movie totals in MovieRollup, so release date dashboards read a
+# few hundred summary rows instead of grouping the whole movies table. The Movie signals
+# apply each save and delete to the rollup rows as a difference. Writes that skip the
+# signals (bulk_create, queryset.update, raw SQL) must be followed by rebuild().
+
+FIELDS = ("budget", "revenue", "vote_average")
+VALUE_FIELDS = ("release_date", "movie_status", *FIELDS)
+
+
+def movie_values(instance):
+    return {
+        name: Movie._meta.get_field(name).to_python(getattr(instance, name))
+        for name in VALUE_FIELDS
+    }
+
+
+def _keys(values):
+    """Return the (year, month, movie_status) of the month and year rows of a movie."""
+    date = values["release_date"]
+    if date is None:
+        return []
+    status = values["movie_status"] or ""
+    return [(date.year, date.month, status), (date.year, 0, status)]
+
+
+def _apply(values, sign):
+    """Add (sign 1) or remove (sign -1) a movie's values to or from its rollup rows."""
+    for year, month, status in _keys(values):
+        rows = MovieRollup.objects.filter(year=year, month=month, movie_status=status)
+        updates = {"movie_count": F("movie_count") + sign}
+        for field in FIELDS:
+            if values[field] is not None:
+                updates[f"{field}_count"] = F(f"{field}_count") + sign
+                updates[f"{field}_sum"] = F(f"{field}_sum") + sign * values[field]
+        if rows.update(**updates) or sign < 0:
+            continue
+        initial = {"movie_count": 1}
+        for field in FIELDS:
+            if values[field] is not None:
+                initial[f"{field}_count"] = 1
+                initial[f"{field}_sum"] = values[field]
+        try:
+            with transaction.atomic():
+                MovieRollup.objects.create(
+                    year=year, month=month, movie_status=status, **initial
+                )
+        except IntegrityError:
+            # Created by a concurrent save since the update above
+            rows.update(**updates)
+
+
+def movie_saving(instance):
+    # Remember the stored values so post_save can move the movie between rollup rows
+    if instance.pk is not None:
+        instance._rollup_values = (
+            Movie.objects.filter(pk=instance.pk).values(*VALUE_FIELDS).first()
+        )
+
+
+def movie_saved(instance):
+    old_values = getattr(instance, "_rollup_values", None)
+    new_values = movie_values(instance)
+    if old_values == new_values:
+        return
+    if old_values:
+        _apply(old_values, -1)
+    _apply(new_values, 1)
+    instance._rollup_values = new_values
+
+
+def movie_deleted(instance):
+    _apply(movie_values(instance), -1)
+
+
+def rebuild():
+    """Recompute every rollup row from the movies table."""
+    months = (
+        Movie.objects.exclude(release_date=None)
+        .annotate(year=ExtractYear("release_date"), month=ExtractMonth("release_date"))
+        .values("year", "month", "movie_status")
+        .annotate(
+            movie_count=Count("id"),
+            **{f"{field}_count": Count(field) for field in FIELDS},
+            **{f"{field}_sum": Sum(field) for field in FIELDS},
+        )
+        .order_by()
+    )
+    totals = defaultdict(lambda: defaultdict(int))
+    for row in months:
+        status = row.pop("movie_status") or ""
+        year, month = row.pop("year"), row.pop("month")
+        for key in ((year, month, status), (year, 0, status)):
+            for name, value in row.items():
+                totals[key][name] += value or 0
+    with transaction.atomic():
+        MovieRollup.objects.all().delete()
+        MovieRollup.objects.bulk_create(
+            (
+                MovieRollup(year=year, month=month, movie_status=status, **values)
+                for (year, month, status), values in totals.items()
+            ),
+            batch_size=1000,
+        )
+
+
+def _average(field):
+    return Cast(Sum(f"{field}_sum"), FloatField()) / NullIf(Sum(f"{field}_count"), 0)
+
+
+def totals(rollups):
+    """Group rollup rows by period, adding up their statuses, and add the averages."""
+    return (
+        rollups.values("year", "month")
+        .annotate(
+            count=Sum("movie_count"),
+            budget_total=Sum("budget_sum"),
+            budget_avg=_average("budget"),
+            revenue_total=Sum("revenue_sum"),
+            revenue_avg=_average("revenue"),
+            rating_avg=_average("vote_average"),
+        )
+        .filter(count__gt=0)
+    )
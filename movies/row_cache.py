@@ -0,0 +1,109 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from . import versions
+
+# Short-lived identity map of the rows shown on the most recently rendered page
+# of a table, keyed by session and table. Rows are stored as compact tuples and
+# handed back as namedtuples so clicks and actions can avoid a database query.
+# Pages are invalidated by a version counter in the cache, so the cache must be shared
+# by every process that writes Movies (settings.CACHES), management commands included.
+
+ROW_CACHE_TIMEOUT = 300
+VERSION_KEY = "movies:rows:version"
+
+
+@lru_cache(maxsize=None)
+def row_type(fields):
+    return namedtuple("PageRow", fields)
+
+
+def table_key(view_class, prefix):
+    return f"{view_class.__name__}:{prefix}"
+
+
+def _cache_key(session_key, key):
+    return f"movies:rows:{session_key}:{key}"
+
+
+def current_version():
+    return versions.current(VERSION_KEY)
+
+
+def invalidate():
+    """Invalidate every cached page, called whenever a Movie is written."""
+    versions.bump(VERSION_KEY)
+
+
+def remember_rows(request, key, records, fields):
+    # Rows are remembered per session, but a session is not created just for them
+    session_key = request.session.session_key
+    if session_key is None:
+        return
+    rows = {
+        str(record.id): tuple(getattr(record, f) for f in fields) for record in records
+    }
+    entry = {"version": current_version(), "fields": tuple(fields), "rows": rows}
+    cache.set(_cache_key(session_key, key), entry, ROW_CACHE_TIMEOUT)
+
+
+def page_rows(session_key, key):
+    """Return {pk: row} for the last rendered page, or None if nothing is cached."""
+    if session_key is None:
+        return None
+    entry = cache.get(_cache_key(session_key, key))
+    if entry is None or entry["version"] != current_version():
+        return None
+    Row = row_type(entry["fields"])
+    return {pk: Row(*values) for pk, values in entry["rows"].items()}
+
+
+def page_pks(session_key, key):
+    """Return the pks on the last rendered page; edits do not change membership."""
+    entry = cache.get(_cache_key(session_key, key)) if session_key else None
+    return set(entry["rows"]) if entry else set()
+
+
+def get_rows(request, key, pks):
+    """
+    Return a list of rows for pks in the given order, or None if any of them
+    is not on the cached page so that the caller can fall back to a query.
+    """
+    rows = page_rows(request.session.session_key, key)
+    if rows is None:
+        return None
+    try:
+        return [rows[str(pk)] for pk in pks]
+    except KeyError:
+        return None
+
+
+class PageRowCacheMixin:
+    """
+    Use with a TableauxView to remember the rows of each rendered page.
+    Use self.cached_row(pk) and self.cached_rows(pks) to read them back.
+    """
+
+    row_cache_fields = ("id", "title", "release_date", "movie_status")
+
+    def render_template(self, *args, **kwargs):
+        response = super().render_template(*args, **kwargs)
+        response.add_post_render_callback(self._remember_page_rows)
+        return response
+
+    def _remember_page_rows(self, response):
+        # The page queryset has been evaluated by the render so this costs no query
+        page = getattr(self.table, "page", None)
+        if page is not None:
+            key = table_key(type(self), self.prefix)
+            records = [row.record for row in page.object_list]
+            remember_rows(self.request, key, records, self.row_cache_fields)
+
+    def cached_rows(self, pks):
+        return get_rows(self.request, table_key(type(self), self.prefix), pks)
+
+    def cached_row(self, pk):
+        rows = self.cached_rows([pk])
+        return rows[0] if rows else None
@@ -0,0 +1,17 @@
+from django.contrib.sessions.backends import cached_db
+
+# Session engine for table views (settings.SESSION_ENGINE). django-tableaux stores the
+# current breakpoint and column visibility in the session on every table request, which
+# marks the session modified and makes SessionMiddleware write it back even when nothing
+# changed. Assigning a value equal to the stored one is ignored here, so an unchanged
+# session is not written, and sessions are read from the shared cache rather than the
+# database.
+
+
+class SessionStore(cached_db.SessionStore):
+    def __setitem__(self, key, value):
+        current = self._session.get(key, self)
+        # The same object may have been changed in place; only an equal copy is ignored
+        if current is not value and current == value:
+            return
+        super().__setitem__(key, value)
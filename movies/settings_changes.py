@@ -0,0 +1,64 @@
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import resolve, reverse
+from django_htmx.http import trigger_client_event
+from django_tableaux.table import build_table
+
+from .lazy_views import view_class
+from .tableaux_compat import load_state
+
+# Responses to a saved BasicSettingsForm that update the table on the page with only
+# the work the changed settings need. Display settings are applied in the browser by
+# static/table_settings.js, toolbar settings re-render the main toolbar only, and
+# anything else (pagination, filter style, click action...) reloads the table.
+
+# Settings the browser can apply to the rendered table
+CLIENT_SETTINGS = {"sticky_header", "fixed_height", "indicator"}
+# Settings that only change the main toolbar above the rows. Filter pills and the
+# filter button belong to the filter form, which the table reload renders.
+TOOLBAR_SETTINGS = {"row_settings", "column_settings"}
+
+
+def changed_settings(old, new):
+    """Return the names of the settings whose value differs between old and new data."""
+    return {k for k in old.keys() | new.keys() if old.get(k) != new.get(k)}
+
+
+def settings_response(request, view_name, old, new, form_fields):
+    """Return the response to a settings form that changed preferences old to new."""
+    changed = changed_settings(old.data, new.data)
+    if not changed:
+        return HttpResponse()
+    if not changed <= CLIENT_SETTINGS | TOOLBAR_SETTINGS:
+        return trigger_client_event(HttpResponse(), name="reloadTableaux")
+
+    content = ""
+    if changed & TOOLBAR_SETTINGS:
+        # The settings form includes the table's filter form, which carries its state
+        state = request.POST.copy()
+        for name in form_fields:
+            state.pop(name, None)
+        if "prefix" not in state:
+            return trigger_client_event(HttpResponse(), name="reloadTableaux")
+        content = render_toolbar(request, view_name, new, state)
+    response = HttpResponse(content)
+    client = {k: new.data.get(k) for k in changed & CLIENT_SETTINGS}
+    if client:
+        trigger_client_event(response, name="tableauxSettings", params=client)
+    return response
+
+
+def render_toolbar(request, view_name, preferences, state):
+    """
+    Render the main toolbar of the table at view_name as an out of band swap.
+    The rows are not fetched; only their count is needed for the toolbar.
+    """
+    url = reverse(view_name)
+    view = view_class(resolve(url).func)()
+    view.setup(request)
+    preferences.apply(view)
+    load_state(view, state)
+    view.table = build_table(view, prefix=view.prefix)
+    context = view.get_context_data()
+    context["url"] = url
+    return render_to_string("movies/settings_toolbar.html", context, request)
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import autocomplete, histograms, rollups, row_cache
+from .change_feed import publish_change, publish_reload
+from .models import Movie
+
+
+@receiver(pre_save, sender=Movie)
+def movie_saving(sender, instance, **kwargs):
+    histograms.movie_saving(instance)
+    rollups.movie_saving(instance)
+
+
+@receiver(post_save, sender=Movie)
+def movie_saved(sender, instance, **kwargs):
+    row_cache.invalidate()
+    publish_change(instance)
+    autocomplete.movie_saved(instance)
+    histograms.movie_saved(instance)
+    rollups.movie_saved(instance)
+
+
+@receiver(post_delete, sender=Movie)
+def movie_deleted(sender, instance, **kwargs):
+    row_cache.invalidate()
+    publish_change(instance, deleted=True)
+    autocomplete.movie_deleted(instance)
+    histograms.movie_deleted(instance)
+    rollups.movie_deleted(instance)
+
+
+def movies_bulk_written():
+    """
+    Bring the state derived from Movies up to date after writes that send no signals,
+    such as bulk_create(), update() and raw SQL.
+    """
+    row_cache.invalidate()
+    autocomplete.invalidate()
+    histograms.invalidate()
+    rollups.rebuild()
+    publish_reload()
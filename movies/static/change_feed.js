@@ -0,0 +1,44 @@
+// Listen to the server-sent event change feed and swap changed rows in place.
+// The feed renders rows with the table's current state, sent from its filter form,
+// so it reconnects whenever htmx swaps in a table with a different state.
+function connectChangeFeed(url, prefix, bp) {
+    let source = null;
+    let current = null;
+
+    function connect() {
+        const form = document.getElementById(prefix + "filter_form");
+        const params = form ? new URLSearchParams(new FormData(form)) : new URLSearchParams({prefix, bp});
+        const next = url + "?" + params;
+        if (next === current) {
+            return;
+        }
+        if (source) {
+            source.close();
+        }
+        current = next;
+        source = new EventSource(next);
+        source.addEventListener("row", (event) => {
+            const template = document.createElement("template");
+            template.innerHTML = event.data.trim();
+            const row = template.content.firstElementChild;
+            const old = row && document.getElementById(row.id);
+            if (old) {
+                row.removeAttribute("hx-swap-oob");
+                old.replaceWith(row);
+                htmx.process(row);
+            }
+        });
+        source.addEventListener("delete", (event) => {
+            const old = document.getElementById(event.data);
+            if (old) {
+                old.remove();
+            }
+        });
+        source.addEventListener("reload", () => {
+            window.dispatchEvent(new Event("reloadTableaux"));
+        });
+    }
+
+    connect();
+    document.body.addEventListener("htmx:afterSettle", connect);
+}
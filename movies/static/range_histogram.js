@@ -0,0 +1,88 @@
+// Draw a histogram with min/max sliders above each pair of range filter inputs.
+// Match counts are estimated from the histogram so dragging makes no requests;
+// the filter inputs only change, and the table reloads, when a slider is released.
+const histogramCache = {};
+
+function loadHistograms(url) {
+    if (!histogramCache[url]) {
+        histogramCache[url] = fetch(url).then((response) => response.json());
+    }
+    return histogramCache[url];
+}
+
+function estimateMatches(histogram, low, high) {
+    const { edges, counts } = histogram;
+    let count = 0;
+    counts.forEach((n, i) => {
+        const start = edges[i];
+        const end = edges[i + 1];
+        if (end < low || start > high) {
+            return;
+        }
+        count += end === start ? n : (n * Math.max(Math.min(end, high) - Math.max(start, low), 0)) / (end - start);
+    });
+    return Math.round(count);
+}
+
+function initRangeHistogram(minInput, maxInput, histogram) {
+    const { edges, counts } = histogram;
+    const low = edges[0];
+    const high = edges[edges.length - 1];
+    const peak = Math.max(...counts, 1);
+    const container = document.createElement("div");
+    container.className = "range-histogram";
+    const bars = document.createElement("div");
+    bars.className = "range-histogram-bars";
+    counts.forEach((n) => {
+        const bar = document.createElement("span");
+        bar.style.height = `${(100 * n) / peak}%`;
+        bars.append(bar);
+    });
+    const sliders = [minInput, maxInput].map((input, i) => {
+        const slider = document.createElement("input");
+        slider.type = "range";
+        slider.min = low;
+        slider.max = high;
+        slider.step = "any";
+        slider.value = input.value || (i === 0 ? low : high);
+        return slider;
+    });
+    const matches = document.createElement("small");
+    const update = () => {
+        const [a, b] = sliders.map((slider) => Number(slider.value));
+        // The histograms cover the whole table, not the rows left by the other filters
+        const estimate = estimateMatches(histogram, Math.min(a, b), Math.max(a, b));
+        matches.textContent = `≈ ${estimate} of all ${histogram.total} movies`;
+    };
+    sliders.forEach((slider, i) => {
+        const input = i === 0 ? minInput : maxInput;
+        slider.addEventListener("input", update);
+        slider.addEventListener("change", () => {
+            const value = Number(slider.value);
+            input.value = value === (i === 0 ? low : high) ? "" : value;
+            input.dispatchEvent(new Event("change", { bubbles: true }));
+        });
+    });
+    container.append(bars, ...sliders, matches);
+    minInput.before(container);
+    update();
+}
+
+function initRangeHistograms(root) {
+    root.querySelectorAll("input[data-histogram-field][name$='_min']").forEach((minInput) => {
+        if (minInput.dataset.histogramReady) {
+            return;
+        }
+        minInput.dataset.histogramReady = "true";
+        const field = minInput.dataset.histogramField;
+        const maxInput = minInput.form.querySelector(`input[name='${minInput.name.replace(/_min$/, "_max")}']`);
+        loadHistograms(minInput.dataset.histogramUrl).then((data) => {
+            if (data[field] && maxInput) {
+                initRangeHistogram(minInput, maxInput, data[field]);
+            }
+        });
+    });
+}
+
+document.addEventListener("DOMContentLoaded", () => initRangeHistograms(document));
+document.addEventListener("htmx:afterSettle", (event) => initRangeHistograms(event.target));
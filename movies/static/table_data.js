@@ -0,0 +1,83 @@
+// Build table rows in the browser from the columnar JSON of the table data endpoint
+function formatCell(column, value) {
+    if (value === null || value === undefined) {
+        return "";
+    }
+    if (column.format === "currency") {
+        const number = column.integer ? Math.trunc(value) : value;
+        return `${column.prefix || ""}${number.toLocaleString("en-US")}${column.suffix || ""}`;
+    }
+    if (column.format === "date") {
+        // A date without a time is parsed as UTC midnight; read it as local time instead
+        return new Date(value.length === 10 ? `${value}T00:00` : value).toLocaleDateString();
+    }
+    return String(value);
+}
+
+function renderTableData(table, moreButton) {
+    const url = new URL(table.dataset.url, window.location.href);
+    const thead = table.querySelector("thead");
+    const tbody = table.querySelector("tbody");
+    let cursor = 0;
+    let orderBy = "";
+
+    function renderHeader(columns) {
+        const tr = document.createElement("tr");
+        for (const column of columns) {
+            const th = document.createElement("th");
+            th.textContent = column.header;
+            if (column.align === "right") {
+                th.style.textAlign = "right";
+            }
+            if (column.orderable) {
+                th.style.cursor = "pointer";
+                th.addEventListener("click", () => {
+                    orderBy = orderBy === column.name ? `-${column.name}` : column.name;
+                    load(true);
+                });
+            }
+            tr.append(th);
+        }
+        thead.replaceChildren(tr);
+    }
+
+    function renderRows(payload) {
+        const fragment = document.createDocumentFragment();
+        payload.data.id.forEach((id, i) => {
+            const tr = document.createElement("tr");
+            if (id !== null) {
+                tr.dataset.id = id;
+            }
+            for (const column of payload.columns) {
+                const td = document.createElement("td");
+                td.textContent = formatCell(column, payload.data[column.name][i]);
+                if (column.align === "right") {
+                    td.style.textAlign = "right";
+                }
+                tr.append(td);
+            }
+            fragment.append(tr);
+        });
+        tbody.append(fragment);
+    }
+
+    async function load(reset) {
+        if (reset) {
+            cursor = 0;
+        }
+        url.searchParams.set("cursor", cursor);
+        url.searchParams.set("~order_by", orderBy);
+        const response = await fetch(url);
+        const payload = await response.json();
+        if (reset || !thead.firstChild) {
+            renderHeader(payload.columns);
+            tbody.replaceChildren();
+        }
+        renderRows(payload);
+        cursor = payload.cursor;
+        moreButton.hidden = cursor === null;
+    }
+
+    moreButton.addEventListener("click", () => load(false));
+    load(true);
+}
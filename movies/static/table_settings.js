@@ -0,0 +1,29 @@
+// Applies display settings saved by a settings form to the tables on the page without
+// reloading them. The server sends the changed settings in a tableauxSettings event.
+document.body.addEventListener("tableauxSettings", (event) => {
+  const settings = event.detail;
+  document.querySelectorAll(".tableaux").forEach((tableaux) => {
+    if ("sticky_header" in settings) {
+      tableaux.querySelectorAll("thead").forEach((thead) => {
+        thead.classList.toggle("sticky", Boolean(settings.sticky_header));
+      });
+    }
+    if ("fixed_height" in settings) {
+      const height = parseInt(settings.fixed_height) || 0;
+      tableaux.querySelectorAll(".tbx-table-wrapper").forEach((wrapper) => {
+        wrapper.style.overflowY = height > 0 ? "auto" : "";
+        wrapper.style.maxHeight = height > 0 ? `${height}px` : "";
+      });
+    }
+    if ("indicator" in settings) {
+      // hx-indicator is inherited, so setting it once on the container covers the
+      // filter form, page links and row requests
+      tableaux.querySelectorAll("[hx-indicator]").forEach((el) => el.removeAttribute("hx-indicator"));
+      if (settings.indicator) {
+        tableaux.setAttribute("hx-indicator", `#${tableaux.dataset.prefix || ""}tableaux_overlay`);
+      } else {
+        tableaux.removeAttribute("hx-indicator");
+      }
+    }
+  });
+});
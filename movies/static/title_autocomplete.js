@@ -0,0 +1,23 @@
+// Fill a datalist with title suggestions for inputs that have a data-autocomplete-url
+document.addEventListener("input", (event) => {
+    const input = event.target;
+    const url = input.dataset && input.dataset.autocompleteUrl;
+    if (!url) {
+        return;
+    }
+    const listId = `${input.id || input.name}_suggestions`;
+    let datalist = document.getElementById(listId);
+    if (!datalist) {
+        datalist = document.createElement("datalist");
+        datalist.id = listId;
+        input.after(datalist);
+        input.setAttribute("list", listId);
+    }
+    fetch(`${url}?q=${encodeURIComponent(input.value)}`)
+        .then((response) => response.json())
+        .then((data) => {
+            datalist.replaceChildren(
+                ...data.results.map((result) => new Option(result.title))
+            );
+        });
+});
@@ -0,0 +1,80 @@
+// Keep only the visible window of rows in the DOM for VirtualRowsMixin tables
+function initVirtualRows(top) {
+    if (top.dataset.ready) {
+        return;
+    }
+    top.dataset.ready = "true";
+    const tbody = top.parentElement;
+    const bottom = tbody.querySelector(".virtual-spacer-bottom");
+    const scroller = tbody.closest(".tbx-table-wrapper");
+    const buffer = Number(top.dataset.buffer);
+    let total = Number(top.dataset.total);
+    let start = Math.max(Number(top.dataset.start), 0);
+    let rows = dataRows();
+    const rowHeight = rows.length ? rows[0].offsetHeight : 32;
+    let request = 0;
+    let scheduled = false;
+
+    function dataRows() {
+        const result = [];
+        for (let row = top.nextElementSibling; row && row !== bottom; row = row.nextElementSibling) {
+            result.push(row);
+        }
+        return result;
+    }
+
+    function setSpacers() {
+        top.firstElementChild.style.height = `${start * rowHeight}px`;
+        const after = Math.max(total - start - rows.length, 0);
+        bottom.firstElementChild.style.height = `${after * rowHeight}px`;
+    }
+
+    async function update() {
+        const first = Math.max(Math.floor(scroller.scrollTop / rowHeight) - buffer, 0);
+        const count = Math.ceil(scroller.clientHeight / rowHeight) + 2 * buffer;
+        const end = Math.min(first + count, total);
+        // Nothing to do while the buffer still covers the viewport
+        if (first >= start && end <= start + rows.length) {
+            return;
+        }
+        const id = ++request;
+        const response = await fetch(`${top.dataset.windowUrl}&_window=${first}&_count=${count}`);
+        if (!response.ok || id !== request) {
+            return;
+        }
+        const template = document.createElement("template");
+        template.innerHTML = (await response.text()).trim();
+        rows.forEach((row) => row.remove());
+        rows = Array.from(template.content.children);
+        top.after(...rows);
+        rows.forEach((row) => htmx.process(row));
+        start = first;
+        total = Number(response.headers.get("X-Row-Count"));
+        setSpacers();
+    }
+
+    function onScroll() {
+        // The table was swapped out by a sort or filter request
+        if (!top.isConnected) {
+            scroller.removeEventListener("scroll", onScroll);
+            return;
+        }
+        if (!scheduled) {
+            scheduled = true;
+            requestAnimationFrame(() => {
+                scheduled = false;
+                update();
+            });
+        }
+    }
+
+    scroller.addEventListener("scroll", onScroll);
+    setSpacers();
+}
+
+htmx.onLoad((element) => {
+    if (element.matches(".virtual-spacer-top")) {
+        initVirtualRows(element);
+    }
+    element.querySelectorAll(".virtual-spacer-top").forEach(initVirtualRows);
+});
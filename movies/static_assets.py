@@ -0,0 +1,154 @@
+import gzip
+import json
+import mimetypes
+import os
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+import brotli
+
+# Static files with content hashed names and precompressed variants.
+# collectstatic (with CompressedManifestStaticFilesStorage) writes name.br and name.gz
+# next to every compressible file in STATIC_ROOT. StaticAssetsMiddleware serves the
+# smallest variant the browser accepts. Hashed names never change content, so they are
+# cached for a year; unhashed names are revalidated on every use.
+
+COMPRESS_EXTENSIONS = {".css", ".js", ".json", ".map", ".svg", ".txt", ".html", ".xml"}
+MIN_SIZE = 512
+# Variants saving less than this fraction of the original are not kept
+MIN_SAVING = 0.05
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=0, must-revalidate"
+
+
+def compress(path):
+    """Write the .br and .gz variants of the file at path; return their encodings."""
+    with open(path, "rb") as f:
+        data = f.read()
+    written = []
+    variants = {
+        "br": lambda: brotli.compress(data, quality=11),
+        "gzip": lambda: gzip.compress(data, compresslevel=9, mtime=0),
+    }
+    for encoding, suffix in ENCODINGS:
+        compressed = variants[encoding]()
+        if len(compressed) < len(data) * (1 - MIN_SAVING):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+            written.append(encoding)
+    return written
+
+
+def compressible(name):
+    return os.path.splitext(name)[1].lower() in COMPRESS_EXTENSIONS
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes precompressed variants of files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if compressible(name) and self.exists(name) and self.size(name) >= MIN_SIZE:
+                encodings = compress(self.path(name))
+                if encodings:
+                    yield name, f"{name} ({', '.join(encodings)})", True
+
+
+def accepted_encodings(header):
+    """Return the content codings allowed by an Accept-Encoding header."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+class StaticAssetsMiddleware:
+    """
+    Serve STATIC_ROOT without going through the rest of the stack.
+    Files are indexed when the process starts, so run collectstatic before starting it.
+    Not used with DEBUG, where runserver serves the source files and STATIC_ROOT may
+    hold a stale collectstatic.
+    """
+
+    def __init__(self, get_response):
+        if settings.DEBUG:
+            raise MiddlewareNotUsed(
+                "Static files are served from the source with DEBUG"
+            )
+        self.get_response = get_response
+        self.prefix = urlsplit(settings.STATIC_URL or "").path
+        if not self.prefix.startswith("/"):
+            self.prefix = "/" + self.prefix
+        self.root = str(settings.STATIC_ROOT or "")
+        self.assets = self.index() if self.root and os.path.isdir(self.root) else {}
+
+    def index(self):
+        """Map each file name under STATIC_ROOT to (path, encodings, cache control)."""
+        hashed = set()
+        manifest = os.path.join(self.root, ManifestStaticFilesStorage.manifest_name)
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                hashed = set(json.load(f).get("paths", {}).values())
+        files = set()
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.relpath(os.path.join(directory, name), self.root)
+                files.add(path.replace(os.sep, "/"))
+        assets = {}
+        for name in files:
+            if name.endswith((".br", ".gz")) and name[:-3] in files:
+                continue
+            encodings = tuple(e for e, suffix in ENCODINGS if name + suffix in files)
+            cache_control = IMMUTABLE if name in hashed else REVALIDATE
+            assets[name] = (os.path.join(self.root, name), encodings, cache_control)
+        return assets
+
+    def __call__(self, request):
+        path = request.path_info
+        if request.method in ("GET", "HEAD") and path.startswith(self.prefix):
+            asset = self.assets.get(path[len(self.prefix) :])
+            if asset is not None:
+                return self.serve(request, *asset)
+        return self.get_response(request)
+
+    def serve(self, request, path, encodings, cache_control):
+        stat = os.stat(path)
+        if cache_control == REVALIDATE and not was_modified_since(
+            request.headers.get("If-Modified-Since"), stat.st_mtime
+        ):
+            return HttpResponseNotModified()
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        encoding = next((e for e in encodings if e in accepted), None)
+        suffix = dict(ENCODINGS).get(encoding, "")
+        response = FileResponse(open(path + suffix, "rb"), content_type=content_type)
+        # FileResponse names the variant file, which is not what the browser asked for
+        del response["Content-Disposition"]
+        if encoding:
+            response["Content-Encoding"] = encoding
+        if encodings:
+            response["Vary"] = "Accept-Encoding"
+        response["Cache-Control"] = cache_control
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        return response
@@ -0,0 +1,104 @@
+import datetime
+from decimal import Decimal
+
+import django_tables2 as tables
+from django.http import Http404, JsonResponse
+from django.urls import NoReverseMatch, resolve, reverse
+from django_tableaux.columns import CurrencyColumn, RightAlignedColumn
+from django_tableaux.models import Pagination
+from django_tableaux.table import build_table
+from django_tableaux.views import TableauxView
+
+from .lazy_views import view_class as resolve_view_class
+from .tableaux_compat import load_state
+
+# Compact columnar JSON for the rows of a table view, rendered client side by
+# static/table_data.js. The response holds one array per visible column, a schema
+# describing how to format each column and a cursor for the next slice of rows.
+# The query string is the same as for the view itself (filters, ~order_by, prefix, bp)
+# plus cursor and limit.
+
+MAX_LIMIT = 500
+PK = tables.A("pk")
+
+
+def column_schema(bound_column):
+    column = bound_column.column
+    schema = {"name": bound_column.name, "header": str(bound_column.header)}
+    if bound_column.orderable:
+        schema["orderable"] = True
+    if isinstance(column, RightAlignedColumn):
+        schema["align"] = "right"
+    if isinstance(column, CurrencyColumn):
+        schema["format"] = "currency"
+        schema["prefix"] = column.prefix
+        schema["suffix"] = column.suffix
+        if column.integer:
+            schema["integer"] = True
+    elif isinstance(column, (tables.DateColumn, tables.DateTimeColumn)):
+        schema["format"] = "date"
+    return schema
+
+
+def client_renders(column):
+    # Template columns such as the selection checkboxes need the server; dates do not
+    if isinstance(column, (tables.DateColumn, tables.DateTimeColumn)):
+        return True
+    return not isinstance(column, tables.TemplateColumn)
+
+
+def json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def table_columns(view, request, offset, limit):
+    """Return the columnar JSON of rows offset to offset + limit of the view's table."""
+    query = request.GET.copy()
+    for key in ("cursor", "limit"):
+        query.pop(key, None)
+    load_state(view, query)
+    # The cursor replaces the view's own pagination
+    view.pagination = Pagination.NONE
+    view.get_filtered_object_list()
+    table = build_table(view, prefix=view.prefix)
+    columns = [
+        column
+        for column in table.columns
+        if column.visible and client_renders(column.column)
+    ]
+    records = list(table.data[offset : offset + limit + 1])
+    more = len(records) > limit
+    records = records[:limit]
+    # Rows without a primary key, such as the dicts of aggregated tables, get a null id
+    data = {"id": [PK.resolve(record, quiet=True) for record in records]}
+    for column in columns:
+        data[column.name] = [
+            json_value(column.accessor.resolve(record, quiet=True))
+            for record in records
+        ]
+    return {
+        "columns": [column_schema(column) for column in columns],
+        "data": data,
+        "cursor": offset + limit if more else None,
+    }
+
+
+def table_data(request, url_name):
+    try:
+        cls = resolve_view_class(resolve(reverse(url_name)).func)
+    except NoReverseMatch:
+        raise Http404(f"No table view named '{url_name}'")
+    if cls is None or not issubclass(cls, TableauxView):
+        raise Http404(f"View '{url_name}' is not a table view")
+    view = cls()
+    view.setup(request)
+    try:
+        offset = max(int(request.GET.get("cursor", 0)), 0)
+        limit = min(max(int(request.GET.get("limit", view.per_page)), 1), MAX_LIMIT)
+    except ValueError:
+        raise Http404("Invalid cursor or limit")
+    return JsonResponse(table_columns(view, request, offset, limit))
@@ -0,0 +1,25 @@
+from django_tableaux.utils import strip_prefix_from_keys
+
+# TableauxView.get() reads the table state from the query string before it builds the
+# table, using private parts of django-tableaux. Responses that render part of a table
+# outside of get() (JSON data, virtual scroll windows, the settings toolbar, changed
+# rows) set the view up here, so that only this module follows the library's internals.
+
+
+def load_state(view, query):
+    """
+    Set the prefix, query_dict, filter data and breakpoint of view from query,
+    a QueryDict of the parameters the table's own requests send.
+    """
+    view.prefix = query.get("prefix", view.prefix)
+    query_dict = strip_prefix_from_keys(view._querydict_to_dict(query), view.prefix)
+    query_dict.pop("prefix", None)
+    # The filter form carries the filter values the table was last rendered with
+    filter_raw = query_dict.pop("~filter_data", "")
+    if filter_raw:
+        view.filter_data = view._parse_qs_dict(filter_raw)
+    for k, v in view.filter_data.items():
+        query_dict.setdefault(k, v)
+    view.query_dict = query_dict
+    view._bp = query_dict.get("bp", "")
+    view._apply_responsive_settings()
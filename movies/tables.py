@@ -1,6 +1,8 @@
 import django_tables2 as tables
+from django.urls import reverse
 from django_tableaux.columns import CurrencyColumn, RightAlignedColumn, SelectionColumn
 from movies.models import Movie
+from movies.responsive import BreakpointVariants
 
 
 class MovieTable(tables.Table):
@@ -42,7 +44,7 @@ class MovieTableSelection(tables.Table):
     runtime = RightAlignedColumn()
 
 
-class MovieTableResponsive(tables.Table):
+class MovieTableResponsive(BreakpointVariants, tables.Table):
     class Meta:
         model = Movie
         fields = (
@@ -84,12 +86,15 @@ class MovieTableResponsive(tables.Table):
             "attrs": {"th": "strong bg-dark text-white", "tr": "bg-light"},
         }
         responsive = {"sm": columns_sm, "md": columns_md, "lg": columns_lg, "xl": columns_xl}
+        # Columns users can add at a breakpoint; the sm and md variants drop the others
+        responsive_optional = {"sm": [], "md": ["release_date", "revenue"]}
 
     selection = SelectionColumn()
     budget = CurrencyColumn(prefix="$")
     revenue = CurrencyColumn(prefix="$")
     popularity = RightAlignedColumn()
     runtime = RightAlignedColumn()
+    profit = CurrencyColumn(prefix="$")
 
 
 class MovieTable4(tables.Table):
@@ -113,3 +118,48 @@ class MovieTable4(tables.Table):
     revenue = CurrencyColumn(attrs={"td": {"class": "td_edit"}})
     runtime = RightAlignedColumn()
     vote_count = tables.Column()
+
+
+def rollup_movies_url(record):
+    if record["month"]:
+        return reverse("rollup_movies_month", args=(record["year"], record["month"]))
+    return reverse("rollup_movies", args=(record["year"],))
+
+
+def rollup_months_url(record):
+    # Year rows drill down into their months
+    if not record["month"]:
+        return reverse("rollup_months", args=(record["year"],))
+    return None
+
+
+class RollupTable(tables.Table):
+    # Rows are dicts from movies.rollups.totals()
+    class Meta:
+        attrs = {"class": "table table-sm table-hover"}
+
+    period = tables.Column(
+        accessor="year", order_by=("year", "month"), linkify=rollup_months_url
+    )
+    count = RightAlignedColumn(verbose_name="Movies")
+    budget_total = CurrencyColumn(prefix="$", verbose_name="Total budget")
+    budget_avg = CurrencyColumn(prefix="$", integer=True, verbose_name="Average budget")
+    revenue_total = CurrencyColumn(prefix="$", verbose_name="Total revenue")
+    revenue_avg = CurrencyColumn(
+        prefix="$", integer=True, verbose_name="Average revenue"
+    )
+    rating_avg = RightAlignedColumn(verbose_name="Average rating")
+    movies = tables.Column(
+        empty_values=(), orderable=False, verbose_name="", linkify=rollup_movies_url
+    )
+
+    def render_period(self, record):
+        if record["month"]:
+            return f"{record['year']}-{record['month']:02}"
+        return record["year"]
+
+    def render_rating_avg(self, value):
+        return f"{value:.2f}"
+
+    def render_movies(self):
+        return "Movies"
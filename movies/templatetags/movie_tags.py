@@ -1,5 +1,6 @@
 from django import template
 from django.contrib.messages import constants as messages_constants
+from django.core.handlers.asgi import ASGIRequest
 
 register = template.Library()
 
@@ -32,3 +33,12 @@ def render_messages(context):
             for msg in messages
         ]
     }
+
+
+@register.filter
+def is_asgi(request):
+    """
+    True when the request is served by an ASGI server. Long lived streams such as the
+    change feed would hold a worker thread for good under WSGI or runserver.
+    """
+    return isinstance(request, ASGIRequest)
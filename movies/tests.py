@@ -1,3 +1,1287 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import random
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.utils import OperationalError, load_backend
+from django.http import Http404, HttpResponse
+from django.test import (
+    AsyncClient,
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+import django_tables2 as tables
+
+from demo_tables.sqlite_pool import base as sqlite_pool
+from demo_tables.sqlite_pool.router import READ_DB_ALIAS, ReadWriteRouter
+
+from . import (
+    autocomplete,
+    change_feed,
+    coalesce,
+    exports,
+    histograms,
+    profiling,
+    rollups,
+    row_cache,
+    static_assets,
+    versions,
+)
+from .autocomplete import TitleIndex
+from .lazy_views import view_class
+from .management.commands import sync_data
+from .models import DERIVED_FIELDS, Movie, MovieRollup
+from .responsive import _merge_attrs
+from .views import ValuesRowsMixin
+from .tables import MovieTable, MovieTableResponsive
+from .sessions import SessionStore
+
+# Performance budgets for every TableauxView route in demo_tables/urls.py.
+# Each route gets a set of representative htmx requests against a fixed fixture; the
+# query count of each is compared with the snapshot in perf_budgets.json. Render times
+# depend on the machine, so they are only checked with PERF_BUDGET_TIMING=1.
+# Run with UPDATE_PERF_BUDGETS=1 to record new budgets.
+
+# Settings may be overridden while a test starts another process
+SETTINGS_MODULE = settings.SETTINGS_MODULE
+BUDGETS_PATH = Path(__file__).with_name("perf_budgets.json")
+FIXTURE_ROWS = 500
+TIMING_RUNS = 7
+REQUESTS = {
+    "load": {},
+    "sort": {"~order_by": "-title"},
+    "page": {"~page": "2"},
+}
+
+
+def table_routes():
+    """Return (url_name, view class) for every route served by a TableauxView."""
+    from django_tableaux.views import TableauxView
+
+    routes = []
+    for pattern in get_resolver().url_patterns:
+        if not isinstance(pattern, URLPattern) or pattern.pattern.converters:
+            continue
+        cls = view_class(pattern.callback)
+        if cls is not None and issubclass(cls, TableauxView):
+            routes.append((pattern.name, cls))
+    return routes
+
+
+def unsupported(view):
+    """Return why the installed django-tableaux cannot build the view's table."""
+    from django_tableaux.utils import define_columns
+
+    table = view.table_class([])
+    try:
+        define_columns(table, view().get_breakpoint_values(), "lg")
+    except ImproperlyConfigured as e:
+        return str(e)
+    return None
+
+
+def isolated_settings(directory):
+    """Settings that keep the cache and files written by the app under directory."""
+    directory = Path(directory)
+    return {
+        "CACHES": {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": str(directory / "cache"),
+            }
+        },
+        "COALESCE_DIR": str(directory / "coalesce"),
+        "EXPORT_DIR": str(directory / "exports"),
+        "PROFILE_DIR": str(directory / "profiles"),
+    }
+
+
+class IsolatedStateMixin:
+    """
+    Run the tests of a class against a cache and app directories of its own.
+    The file based cache and the coalesce directory are shared by every process on
+    the host, so tests must not read or clear the ones of the development server.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        cls.state_dir = Path(directory.name)
+        override = override_settings(**isolated_settings(cls.state_dir))
+        override.enable()
+        cls.addClassCleanup(override.disable)
+        super().setUpClass()
+
+
+def django_process(code, *args, state_dir=None, **kwargs):
+    """
+    Start a Python process that sets up Django and runs code with args in sys.argv.
+    With state_dir, the process uses the cache and app directories of isolated_settings.
+    """
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": SETTINGS_MODULE}
+    setup = "import django; django.setup()\n"
+    if state_dir is not None:
+        setup += (
+            "from django.test import override_settings\n"
+            "from movies.tests import isolated_settings\n"
+            f"override_settings(**isolated_settings({str(state_dir)!r})).enable()\n"
+        )
+    return subprocess.Popen(
+        [sys.executable, "-c", setup + code, *args],
+        cwd=settings.BASE_DIR,
+        env=env,
+        **kwargs,
+    )
+
+
+def tolerance():
+    default = getattr(settings, "PERF_BUDGET_TOLERANCE", 0.5)
+    return float(os.environ.get("PERF_BUDGET_TOLERANCE", default))
+
+
+class PerformanceBudgetTests(IsolatedStateMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = date(1980, 1, 1)
+        statuses = ["Released", "Post Production", "In Production", "Planned"]
+        Movie.objects.bulk_create(
+            Movie(
+                title=f"Movie {i:04}",
+                budget=i * 10000,
+                revenue=i * 25000,
+                popularity=i % 100,
+                runtime=80 + i % 90,
+                release_date=start + timedelta(days=i * 23),
+                movie_status=statuses[i % len(statuses)],
+                vote_average=i % 10,
+                vote_count=i * 3,
+            )
+            for i in range(1, FIXTURE_ROWS + 1)
+        )
+        # bulk_create skips the signals that maintain the rollups
+        rollups.rebuild()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.budgets = (
+            json.loads(BUDGETS_PATH.read_text()) if BUDGETS_PATH.exists() else {}
+        )
+        cls.measured = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.environ.get("UPDATE_PERF_BUDGETS"):
+            BUDGETS_PATH.write_text(
+                json.dumps(cls.measured, indent=2, sort_keys=True) + "\n"
+            )
+        super().tearDownClass()
+
+    def measure(self, url, view, params):
+        prefix = view.prefix or ""
+        data = {"prefix": prefix, "bp": "lg", **params}
+        headers = {
+            "HX-Request": "true",
+            "HX-Trigger-Name": "table_load",
+            "HX-Target": f"{prefix}tableaux",
+            "HX-Current-Url": f"http://testserver{url}",
+        }
+        # The first request sets up the session and column settings
+        response = self.client.get(url, data, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        timings = []
+        for _ in range(TIMING_RUNS):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                self.client.get(url, data, headers=headers)
+                timings.append((time.perf_counter() - start) * 1000)
+        # The fastest run is the least affected by noise from the rest of the machine
+        return {"queries": len(queries), "ms": round(min(timings), 1)}
+
+    def test_table_views_within_budget(self):
+        limit = 1 + tolerance()
+        check_timing = os.environ.get("PERF_BUDGET_TIMING")
+        for name, view in table_routes():
+            url = reverse(name)
+            reason = unsupported(view)
+            for request_name, params in REQUESTS.items():
+                with self.subTest(view=name, request=request_name):
+                    if reason:
+                        self.skipTest(
+                            f"Not supported by the installed django-tableaux: {reason}"
+                        )
+                    result = self.measure(url, view, params)
+                    self.measured.setdefault(name, {})[request_name] = result
+                    if os.environ.get("UPDATE_PERF_BUDGETS"):
+                        continue
+                    budget = self.budgets.get(name, {}).get(request_name)
+                    self.assertIsNotNone(
+                        budget, "No budget recorded, run with UPDATE_PERF_BUDGETS=1"
+                    )
+                    self.assertLessEqual(
+                        result["queries"],
+                        int(budget["queries"] * limit),
+                        f"{result['queries']} queries, budget {budget['queries']}",
+                    )
+                    if check_timing:
+                        self.assertLessEqual(
+                            result["ms"],
+                            budget["ms"] * limit,
+                            f"{result['ms']} ms, budget {budget['ms']} ms",
+                        )
+
+
+class SessionTests(IsolatedStateMixin, TestCase):
+    def test_table_requests_leave_the_session_alone(self):
+        Movie.objects.create(title="Alien")
+        headers = {
+            "HX-Request": "true",
+            "HX-Trigger-Name": "table_load",
+            "HX-Current-Url": "http://testserver/",
+        }
+        data = {"prefix": "", "bp": "lg"}
+        self.client.get(reverse("basic"), data, headers=headers)
+        for params in ({}, {"~order_by": "-title"}):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    reverse("basic"), {**data, **params}, headers=headers
+                )
+            self.assertEqual(response.status_code, 200)
+            sql = [query["sql"] for query in queries]
+            self.assertFalse([q for q in sql if "django_session" in q], sql)
+
+    def test_only_changed_values_modify_the_session(self):
+        session = SessionStore()
+        session["columns"] = {"title": True}
+        session.save()
+        session = SessionStore(session.session_key)
+        session["columns"] = {"title": True}
+        self.assertFalse(session.modified)
+        session["columns"] = {"title": False}
+        self.assertTrue(session.modified)
+        # A value changed in place is saved when it is assigned back
+        session = SessionStore(session.session_key)
+        ids = session.setdefault("ids", [])
+        session.modified = False
+        ids.append(1)
+        session["ids"] = ids
+        self.assertTrue(session.modified)
+
+    def test_rows_are_only_remembered_for_existing_sessions(self):
+        movie = Movie.objects.create(title="Alien")
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        row_cache.remember_rows(request, "key", [movie], ("id", "title"))
+        self.assertIsNone(request.session.session_key)
+        request.session.save()
+        row_cache.remember_rows(request, "key", [movie], ("id", "title"))
+        self.assertEqual(
+            row_cache.get_rows(request, "key", [movie.pk])[0].title, "Alien"
+        )
+
+
+class SingleFlightTests(IsolatedStateMixin, SimpleTestCase):
+    def setUp(self):
+        self.directory = coalesce.coalesce_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Each test starts with an empty directory
+        for path in self.directory.iterdir():
+            path.unlink()
+
+    def test_concurrent_calls_share_one_computation(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"rows": [1, 2, 3]}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(coalesce.single_flight("k", compute))
+            )
+        ]
+        threads[0].start()
+        started.wait(5)
+        for _ in range(4):
+            thread = threading.Thread(
+                target=lambda: results.append(coalesce.single_flight("k", compute))
+            )
+            thread.start()
+            threads.append(thread)
+        # Let the followers reach the wait before the leader finishes
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"rows": [1, 2, 3]}] * 5)
+        # Each caller gets its own copy
+        self.assertEqual(len({id(result) for result in results}), 5)
+
+    def test_later_calls_compute_again(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(coalesce.single_flight("k", compute), 1)
+        self.assertEqual(coalesce.single_flight("k", compute), 2)
+        # Nobody waited, so no result was written
+        self.assertEqual(list(self.directory.glob("*.result")), [])
+
+    def test_other_processes_wait_for_the_result(self):
+        code = (
+            "import time\n"
+            "from movies import coalesce\n"
+            "def compute():\n"
+            "    print('started', flush=True)\n"
+            "    time.sleep(0.5)\n"
+            "    return 'child'\n"
+            "coalesce.single_flight('k', compute)\n"
+        )
+        child = django_process(
+            code, state_dir=self.state_dir, stdout=subprocess.PIPE, text=True
+        )
+        self.addCleanup(child.stdout.close)
+        self.assertEqual(child.stdout.readline().strip(), "started")
+        self.assertEqual(coalesce.single_flight("k", lambda: "parent"), "child")
+        self.assertEqual(child.wait(10), 0)
+
+    def test_purge_removes_unused_files(self):
+        old = time.time() - coalesce.RESULT_TTL - 1
+        for name in ("old.lock", "old.result", "new.lock", "new.result"):
+            (self.directory / name).touch()
+            if name.startswith("old"):
+                os.utime(self.directory / name, (old, old))
+        coalesce.purge_files(self.directory)
+        names = sorted(path.name for path in self.directory.iterdir())
+        self.assertEqual(names, ["new.lock", "new.result"])
+
+
+class VersionTests(IsolatedStateMixin, SimpleTestCase):
+    def test_concurrent_bumps_are_not_lost(self):
+        code = (
+            "from movies import versions\n"
+            "for _ in range(50):\n"
+            "    versions.bump('test:version')\n"
+        )
+        start = versions.current("test:version")
+        children = [django_process(code, state_dir=self.state_dir) for _ in range(4)]
+        self.assertEqual([child.wait(60) for child in children], [0] * 4)
+        self.assertEqual(versions.current("test:version"), start + 200)
+
+
+class VersionedStateTests(IsolatedStateMixin, SimpleTestCase):
+    def setUp(self):
+        self.builds = []
+        self.state = versions.VersionedState("test:state", self.build)
+
+    def build(self):
+        self.builds.append(1)
+        return [len(self.builds)]
+
+    def wait_for_rebuild(self):
+        thread = self.state.rebuilding
+        if thread is not None:
+            thread.join(5)
+
+    def test_first_use_builds(self):
+        self.assertEqual(self.state.get(), [1])
+        self.assertEqual(self.state.get(), [1])
+        self.assertEqual(len(self.builds), 1)
+
+    def test_changes_elsewhere_rebuild_in_the_background(self):
+        self.state.get()
+        versions.bump("test:state")
+        release = threading.Event()
+        build = self.build
+
+        def slow_build():
+            release.wait(5)
+            return build()
+
+        self.state.build = slow_build
+        # The old state is returned while the new one is built
+        self.assertEqual(self.state.get(), [1])
+        self.assertEqual(self.state.get(), [1])
+        release.set()
+        self.wait_for_rebuild()
+        self.assertEqual(self.state.get(), [2])
+        self.assertEqual(len(self.builds), 2)
+
+    def test_own_changes_are_applied(self):
+        self.state.get()
+        self.state.changed(lambda state: state.append("a"))
+        self.assertEqual(self.state.get(), [1, "a"])
+        # A change made elsewhere in between is not known here, so the state is rebuilt
+        versions.bump("test:state")
+        self.state.changed(lambda state: state.append("b"))
+        self.assertEqual(self.state.get(), [1, "a"])
+        self.wait_for_rebuild()
+        self.assertEqual(self.state.get(), [2])
+
+
+class RowCacheTests(IsolatedStateMixin, SimpleTestCase):
+    def test_invalidate_reaches_other_processes(self):
+        before = row_cache.current_version()
+        child = django_process(
+            "from movies import row_cache; row_cache.invalidate()",
+            state_dir=self.state_dir,
+        )
+        self.assertEqual(child.wait(30), 0)
+        self.assertNotEqual(row_cache.current_version(), before)
+
+
+class TitleIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = TitleIndex.build(
+            [
+                (1, "Star Wars", 50),
+                (2, "Stardust", 80),
+                (3, "Starman", 10),
+                (4, "Alien", 90),
+            ],
+            k=2,
+        )
+
+    def test_suggest_most_popular_first(self):
+        self.assertEqual(
+            self.index.suggest("star"), [(2, "Stardust"), (1, "Star Wars")]
+        )
+        self.assertEqual(self.index.suggest("STAR "), [(1, "Star Wars")])
+        self.assertEqual(self.index.suggest("x"), [])
+
+    def test_add_and_update(self):
+        self.index.add(5, "Stargate", 100)
+        self.assertEqual(self.index.suggest("star"), [(5, "Stargate"), (2, "Stardust")])
+        # Updating a title moves the movie and refills the top lists it left
+        self.index.add(5, "Alien Nation", 100)
+        self.assertEqual(
+            self.index.suggest("star"), [(2, "Stardust"), (1, "Star Wars")]
+        )
+        self.assertEqual(
+            self.index.suggest("alien"), [(5, "Alien Nation"), (4, "Alien")]
+        )
+        self.assertEqual(len(self.index), 5)
+
+    def test_remove_refills_and_prunes(self):
+        self.index.remove(2)
+        self.assertEqual(self.index.suggest("star"), [(1, "Star Wars"), (3, "Starman")])
+        self.assertEqual(self.index.suggest("stard"), [])
+        self.assertNotIn("d", self.index._path("star")[-1].children)
+        for pk in (1, 3, 4):
+            self.index.remove(pk)
+        self.index.remove(4)
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.root.children, {})
+        self.assertEqual(self.index.root.top, [])
+
+
+class SQLitePoolTests(SimpleTestCase):
+    # Opens its own connections; this lets the test runner allow database access
+    databases = {DEFAULT_DB_ALIAS}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "pool.sqlite3")
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def wrapper(self, alias, **pool):
+        databases = {
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            alias: {
+                "ENGINE": "demo_tables.sqlite_pool",
+                "NAME": self.path,
+                "OPTIONS": {"pool": pool},
+            },
+        }
+        settings_dict = connections.configure_settings(databases)[alias]
+        wrapper = load_backend("demo_tables.sqlite_pool").DatabaseWrapper(
+            settings_dict, alias
+        )
+        self.addCleanup(sqlite_pool._pools.pop, (os.getpid(), alias), None)
+        return wrapper
+
+    def test_closed_connections_are_reused(self):
+        wrapper = self.wrapper("pool_reuse", size=2)
+        wrapper.connect()
+        raw = wrapper.connection
+        wrapper.close()
+        self.assertIsNone(wrapper.connection)
+        wrapper.connect()
+        self.assertIs(wrapper.connection, raw)
+        wrapper.close()
+        raw.close()
+
+    def test_size_limits_open_connections(self):
+        pool = sqlite_pool.Pool(size=1, timeout=0.05)
+        first = pool.acquire(self.connect)
+        with self.assertRaises(OperationalError):
+            pool.acquire(self.connect)
+        pool.release(first)
+        self.assertIs(pool.acquire(self.connect), first)
+        first.close()
+
+    def test_release_discards_uncommitted_changes(self):
+        pool = sqlite_pool.Pool(size=1)
+        raw = pool.acquire(self.connect)
+        raw.execute("CREATE TABLE t (x INTEGER)")
+        raw.commit()
+        raw.execute("INSERT INTO t VALUES (1)")
+        pool.release(raw)
+        raw = pool.acquire(self.connect)
+        self.assertEqual(raw.execute("SELECT COUNT(*) FROM t").fetchone(), (0,))
+        raw.close()
+
+    def test_router_reads_from_the_writer_inside_a_transaction(self):
+        router = ReadWriteRouter()
+        self.assertEqual(router.db_for_read(Movie), READ_DB_ALIAS)
+        self.assertEqual(router.db_for_write(Movie), DEFAULT_DB_ALIAS)
+        with mock.patch.object(connections[DEFAULT_DB_ALIAS], "in_atomic_block", True):
+            self.assertEqual(router.db_for_read(Movie), DEFAULT_DB_ALIAS)
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, "movies"))
+        self.assertFalse(router.allow_migrate(READ_DB_ALIAS, "movies"))
+
+
+class RollupTests(IsolatedStateMixin, TestCase):
+    def snapshot(self):
+        rows = MovieRollup.objects.values_list(
+            "year",
+            "month",
+            "movie_status",
+            "movie_count",
+            "budget_count",
+            "budget_sum",
+            "revenue_count",
+            "revenue_sum",
+            "vote_average_count",
+            "vote_average_sum",
+        )
+        # Rows emptied by deletes stay behind with zero totals; rebuild() drops them
+        return {row[:3]: row[3:] for row in rows if row[3]}
+
+    def test_incremental_rollups_match_rebuild(self):
+        movies = [
+            Movie.objects.create(
+                title=f"Movie {i}",
+                budget=i * 1000 if i % 3 else None,
+                revenue=i * 2000,
+                release_date=date(2000 + i % 2, 1 + i % 3, 1),
+                movie_status="Released" if i % 2 else "Planned",
+                vote_average=Decimal(i % 10) / 2,
+                vote_count=10,
+            )
+            for i in range(1, 13)
+        ]
+        Movie.objects.create(title="No date", budget=5)
+        # Move movies between periods and statuses, clear values, delete some
+        movies[0].release_date = date(2003, 6, 1)
+        movies[0].save()
+        movies[1].movie_status = "Released"
+        movies[1].budget = None
+        movies[1].save()
+        movies[2].release_date = None
+        movies[2].save()
+        movies[3].delete()
+        movies[4].title = "Renamed"
+        movies[4].save()
+        incremental = self.snapshot()
+        self.assertFalse(
+            MovieRollup.objects.filter(movie_count=0)
+            .exclude(budget_count=0, revenue_count=0)
+            .exists()
+        )
+        rollups.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+
+class InsertDataTests(IsolatedStateMixin, TransactionTestCase):
+    def test_insert_data_loads_the_dump(self):
+        stderr = StringIO()
+        call_command("insert_data", stdout=StringIO(), stderr=stderr)
+        self.assertEqual(stderr.getvalue(), "")
+        self.assertEqual(Movie.objects.count(), 281)
+        # The dump has no content_hash column; the database default fills it
+        self.assertFalse(Movie.objects.exclude(content_hash="").exists())
+
+    def test_insert_data_updates_derived_state(self):
+        modules = (row_cache, autocomplete, histograms)
+        before = [module.current_version() for module in modules]
+        feed = versions.current(change_feed.VERSION_KEY)
+        call_command("insert_data", stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(
+            [module.current_version() for module in modules], [v + 1 for v in before]
+        )
+        # The open tables are told to reload
+        self.assertEqual(versions.current(change_feed.VERSION_KEY), feed + 1)
+        self.assertTrue(MovieRollup.objects.exists())
+
+
+class SyncDataTests(IsolatedStateMixin, TestCase):
+    DUMP = """-- test dump
+INSERT INTO movies_movie
+(id, title, budget, release_date, movie_status, vote_average, vote_count)
+VALUES
+(1,'Four Rooms',4000000,'1995-12-09','Released',6.5,530),
+(2,'It''s Alive',NULL,'1974-10-18','Released',5.0,10),
+(3,'Star Wars',11000000,'1977-05-25','Released',8.1,6624);
+"""
+
+    def sync(self, dump):
+        path = Path(self.directory.name) / "dump.sql"
+        path.write_text(dump, encoding="utf-8")
+        out = StringIO()
+        call_command("sync_data", str(path), stdout=out)
+        return out.getvalue().strip()
+
+    def rows(self):
+        return list(Movie.objects.order_by("id").values())
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_dump_rows_across_chunks(self):
+        rows = list(sync_data.dump_rows(StringIO(self.DUMP), "movies_movie"))
+        # Tokens, quoted strings included, may be split between chunks
+        with mock.patch.object(sync_data, "CHUNK_SIZE", 7):
+            self.assertEqual(
+                list(sync_data.dump_rows(StringIO(self.DUMP), "movies_movie")), rows
+            )
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]["title"], "It's Alive")
+        self.assertIsNone(rows[1]["budget"])
+
+    def test_sync_is_idempotent(self):
+        self.assertEqual(
+            self.sync(self.DUMP), "3 inserted, 0 updated, 0 deleted, 0 unchanged"
+        )
+        rows = self.rows()
+        self.assertEqual(rows[1]["title"], "It's Alive")
+        self.assertEqual(
+            self.sync(self.DUMP), "0 inserted, 0 updated, 0 deleted, 3 unchanged"
+        )
+        self.assertEqual(self.rows(), rows)
+
+        changed = self.DUMP.replace("Four Rooms", "Five Rooms").replace(
+            ",\n(3,'Star Wars',11000000,'1977-05-25','Released',8.1,6624)", ""
+        )
+        self.assertEqual(
+            self.sync(changed), "0 inserted, 1 updated, 1 deleted, 1 unchanged"
+        )
+        self.assertEqual(
+            self.sync(changed), "0 inserted, 0 updated, 0 deleted, 2 unchanged"
+        )
+        titles = Movie.objects.order_by("id").values_list("title", flat=True)
+        self.assertEqual(list(titles), ["Five Rooms", "It's Alive"])
+
+
+class StaticAssetsTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        script = "console.log('tableaux');\n" * 100
+        (root / "app.0123456789ab.js").write_text(script)
+        (root / "app.js").write_text(script)
+        static_assets.compress(str(root / "app.0123456789ab.js"))
+        manifest = {"paths": {"app.js": "app.0123456789ab.js"}, "version": "1.1"}
+        (root / "staticfiles.json").write_text(json.dumps(manifest))
+        override = override_settings(
+            DEBUG=False, STATIC_ROOT=root, STATIC_URL="/static/"
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.middleware = static_assets.StaticAssetsMiddleware(
+            lambda r: HttpResponse("app")
+        )
+
+    def get(self, path, accept_encoding=""):
+        request = RequestFactory().get(
+            path, headers={"Accept-Encoding": accept_encoding}
+        )
+        response = self.middleware(request)
+        if response.streaming:
+            # response.close() would send request_finished, which closes the connections
+            self.addCleanup(response.file_to_stream.close)
+        return response
+
+    def test_not_used_with_debug(self):
+        with override_settings(DEBUG=True), self.assertRaises(MiddlewareNotUsed):
+            static_assets.StaticAssetsMiddleware(lambda r: HttpResponse())
+
+    def test_content_negotiation(self):
+        cases = [
+            ("gzip, deflate, br", "br"),
+            ("gzip", "gzip"),
+            ("br;q=0, gzip;q=0.5", "gzip"),
+            ("br;q=0, gzip;q=0", None),
+            ("", None),
+        ]
+        for accept_encoding, encoding in cases:
+            with self.subTest(accept_encoding):
+                response = self.get("/static/app.0123456789ab.js", accept_encoding)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+                self.assertNotIn("Content-Disposition", response)
+
+    def test_cache_control(self):
+        response = self.get("/static/app.0123456789ab.js")
+        self.assertEqual(response["Cache-Control"], static_assets.IMMUTABLE)
+        response = self.get("/static/app.js")
+        self.assertEqual(response["Cache-Control"], static_assets.REVALIDATE)
+        # Without compressed variants the response does not depend on Accept-Encoding
+        self.assertNotIn("Vary", response)
+        self.assertEqual(
+            b"".join(response.streaming_content).decode(),
+            "console.log('tableaux');\n" * 100,
+        )
+
+    def test_other_paths_pass_through(self):
+        self.assertEqual(self.get("/static/missing.js").content, b"app")
+        self.assertEqual(self.get("/movies/").content, b"app")
+
+
+@mock.patch.object(change_feed, "POLL_SECONDS", 0.05)
+class ChangeFeedTests(IsolatedStateMixin, TransactionTestCase):
+    def setUp(self):
+        self.movies = [Movie.objects.create(title=f"Movie {i}") for i in range(3)]
+        # The page rows are remembered for the session the feed is opened with
+        self.client.session.save()
+        headers = {
+            "HX-Request": "true",
+            "HX-Trigger-Name": "table_load",
+            "HX-Current-Url": "http://testserver/editable/",
+        }
+        response = self.client.get(
+            reverse("editable"), {"prefix": "", "bp": "lg"}, headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def events(self, write, count):
+        """Open the feed, run write in a thread and return the next count messages."""
+
+        async def read():
+            client = AsyncClient()
+            client.cookies = self.client.cookies
+            url = reverse("movie_events", args=["editable"])
+            response = await client.get(url, {"prefix": "", "bp": "lg"})
+            stream = aiter(response.streaming_content)
+            self.assertEqual(await anext(stream), b": connected\n\n")
+            await sync_to_async(write, thread_sensitive=False)()
+            messages = [(await asyncio.wait_for(anext(stream), 5)).decode()]
+            while len(messages) < count:
+                messages.append((await asyncio.wait_for(anext(stream), 5)).decode())
+            await stream.aclose()
+            return messages
+
+        return async_to_sync(read)()
+
+    def test_edit_arrives_as_row(self):
+        movie = self.movies[1]
+
+        def write():
+            movie.title = "Edited"
+            movie.save()
+
+        [message] = self.events(write, 1)
+        self.assertTrue(message.startswith("event: row\n"), message)
+        self.assertIn("Edited", message)
+
+    def test_delete_and_bulk_write(self):
+        pk = self.movies[0].pk
+
+        def write():
+            self.movies[0].delete()
+            # Writes from another process reach the feed through the cache
+            child = django_process(
+                "from movies import change_feed\n"
+                "change_feed.publish(change_feed.RELOAD)",
+                state_dir=self.state_dir,
+            )
+            self.assertEqual(child.wait(30), 0)
+
+        messages = self.events(write, 2)
+        self.assertEqual(messages[0], f"event: delete\ndata: _tr_{pk}\n\n")
+        self.assertEqual(messages[1], "event: reload\ndata: \n\n")
+
+
+class ExportTests(IsolatedStateMixin, TransactionTestCase):
+    def setUp(self):
+        self.movies = [
+            Movie.objects.create(
+                title=f"Movie {i}",
+                popularity=i,
+                release_date=date(2000, 1, i + 1),
+                revenue=i * 100,
+                runtime=i,
+            )
+            for i in range(5)
+        ]
+        self.request = RequestFactory().get("/")
+        self.request.session = SessionStore()
+        # Pool processes would open the development database rather than the test one
+        pool = ThreadPoolExecutor(2)
+        self.addCleanup(pool.shutdown)
+        patcher = mock.patch.object(exports, "get_pool", return_value=pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def finished_job(self, ids, export_format="csv"):
+        job_id = exports.start_export(
+            self.request, MovieTable, ids, ["budget"], export_format, "movies"
+        )
+        deadline = time.monotonic() + 10
+        while (job := exports.read_job(job_id))["state"] in exports.ACTIVE_STATES:
+            self.assertLess(time.monotonic(), deadline, job)
+            time.sleep(0.01)
+        return job
+
+    def test_chunks_keep_the_row_order(self):
+        ids = [movie.pk for movie in reversed(self.movies)]
+        with mock.patch.object(exports, "CHUNK_SIZE", 2):
+            job = self.finished_job(ids)
+        self.assertEqual((job["state"], job["chunks"], job["done"]), ("finished", 3, 3))
+        job_path = exports.export_dir() / job["id"]
+        # merge_parts removes the chunk parts once they are in the export
+        self.assertEqual(
+            sorted(p.name for p in job_path.iterdir()), ["job.json", "movies.csv"]
+        )
+        lines = (job_path / "movies.csv").read_text().splitlines()
+        self.assertEqual(lines[0], "Title,Popularity,Release date,Revenue,Runtime")
+        self.assertEqual(
+            [line.split(",")[0] for line in lines[1:]],
+            [f"Movie {i}" for i in range(4, -1, -1)],
+        )
+        self.assertEqual(lines[1], "Movie 4,4.00,2000-01-05,$400,4")
+
+    def test_jobs_belong_to_their_session(self):
+        job = self.finished_job([self.movies[0].pk])
+        self.assertEqual(
+            exports._job_for_request(self.request, job["id"])["id"], job["id"]
+        )
+        other = RequestFactory().get("/")
+        other.session = SessionStore()
+        other.session.save()
+        for request, job_id in ((other, job["id"]), (self.request, "not-a-job")):
+            with self.subTest(job_id=job_id), self.assertRaises(Http404):
+                exports._job_for_request(request, job_id)
+
+    def test_stale_jobs_are_failed(self):
+        job = self.finished_job([self.movies[0].pk])
+        job["state"] = "running"
+        exports._write_job(job)
+        self.assertEqual(exports.read_job(job["id"])["state"], "running")
+        stale = time.time() - exports.STALE_SECONDS - 1
+        with mock.patch.object(exports.time, "time", return_value=stale):
+            exports._write_job(job)
+        self.assertEqual(exports.read_job(job["id"])["state"], "failed")
+
+    def test_purge_expired(self):
+        old, new = self.finished_job([]), self.finished_job([])
+        expired = time.time() - getattr(settings, "EXPORT_EXPIRY", 3600) - 1
+        os.utime(exports.export_dir() / old["id"], (expired, expired))
+        exports.purge_expired()
+        self.assertIsNone(exports.read_job(old["id"]))
+        self.assertEqual(exports.read_job(new["id"])["state"], "finished")
+
+
+class VirtualRowsTests(IsolatedStateMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i, title in enumerate(["Alien", "Brazil", "Casablanca", "Dune", "Psycho"]):
+            Movie.objects.create(title=title, popularity=i)
+
+    def window(self, **params):
+        url = reverse("infinite_scroll")
+        headers = {
+            "HX-Request": "true",
+            "HX-Trigger-Name": "table_load",
+            "HX-Current-Url": f"http://testserver{url}",
+        }
+        data = {"prefix": "", "bp": "lg", **params}
+        return self.client.get(url, data, headers=headers)
+
+    def titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        ids = [
+            int(pk) for pk in re.findall(r'id="_tr_(\d+)"', response.content.decode())
+        ]
+        return [Movie.objects.get(pk=pk).title for pk in ids]
+
+    def test_window_follows_the_sort_order(self):
+        response = self.window(**{"~order_by": "-title", "_window": 1, "_count": 3})
+        self.assertEqual(self.titles(response), ["Dune", "Casablanca", "Brazil"])
+        self.assertEqual(response["X-Row-Count"], "5")
+        response = self.window(**{"~order_by": "title", "_window": 3, "_count": 5})
+        self.assertEqual(self.titles(response), ["Dune", "Psycho"])
+        self.assertEqual(response["X-Row-Count"], "5")
+
+    def test_invalid_window(self):
+        self.assertEqual(self.window(_window="top").status_code, 400)
+
+
+class SettingsChangeTests(IsolatedStateMixin, TestCase):
+    FORM = {"pagination": "paged", "filter_style": "toolbar", "fixed_height": "0"}
+    # Sent with the form by hx-include from the table's filter form
+    STATE = {"prefix": "A", "bp": "lg"}
+
+    def setUp(self):
+        Movie.objects.create(title="Alien")
+        self.save()
+
+    def save(self, state=STATE, **changes):
+        response = self.client.post(
+            reverse("basic-new"),
+            {**self.FORM, **state, **changes},
+            headers={"HX-Request": "true"},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_toolbar_settings_render_the_toolbar(self):
+        response = self.save(row_settings="on")
+        content = response.content.decode()
+        self.assertIn('<div id="Atoolbar_main" hx-swap-oob="innerHTML">', content)
+        self.assertNotIn("<tr", content)
+        self.assertNotIn("csrfmiddlewaretoken", content)
+        self.assertNotIn("HX-Trigger", response)
+
+    def test_client_settings_are_triggered(self):
+        response = self.save(sticky_header="on")
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            json.loads(response["HX-Trigger"]),
+            {"tableauxSettings": {"sticky_header": True}},
+        )
+
+    def test_other_settings_reload_the_table(self):
+        response = self.save(row_settings="on", filter_pills="on")
+        self.assertEqual(json.loads(response["HX-Trigger"]), {"reloadTableaux": {}})
+        # Without the table's state the toolbar cannot be rendered
+        response = self.save(state={}, column_settings="on")
+        self.assertEqual(json.loads(response["HX-Trigger"]), {"reloadTableaux": {}})
+
+
+class ProfilingTests(IsolatedStateMixin, TestCase):
+    def setUp(self):
+        Movie.objects.create(title="Alien")
+        self.staff = get_user_model().objects.create_user("staff", is_staff=True)
+
+    def get(self, url_name, **params):
+        url = reverse(url_name)
+        headers = {
+            "HX-Request": "true",
+            "HX-Trigger-Name": "table_load",
+            "HX-Current-Url": f"http://testserver{url}",
+        }
+        return self.client.get(
+            url, {"prefix": "", "bp": "lg", **params}, headers=headers
+        )
+
+    def profile(self, request, get_response):
+        request.user = self.staff
+        return profiling.ProfilingMiddleware(get_response)(request)
+
+    def test_profile_is_saved(self):
+        self.client.force_login(self.staff)
+        self.assertNotIn("X-Profile-Id", self.get("basic"))
+        name = self.get("basic", _profile="1")["X-Profile-Id"]
+        files = sorted(path.name for path in profiling.profile_dir().iterdir())
+        self.assertEqual(files, [f"{name}.collapsed", f"{name}.json", f"{name}.pstats"])
+        meta = profiling.recent_profiles()[0]
+        self.assertEqual(
+            (meta["name"], meta["status"], meta["htmx"]), (name, 200, True)
+        )
+        self.assertContains(self.client.get(reverse("profile_list")), name)
+        response = self.client.get(reverse("profile_download", args=[name, "pstats"]))
+        path = profiling.profile_dir() / f"{name}.pstats"
+        self.assertEqual(b"".join(response.streaming_content), path.read_bytes())
+        response = self.client.get(reverse("profile_download", args=[name, "json"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_only_staff_profile(self):
+        self.client.force_login(get_user_model().objects.create_user("user"))
+        self.assertNotIn("X-Profile-Id", self.get("basic", _profile="1"))
+
+    def test_pushed_urls_are_not_profiled(self):
+        def get_response(request):
+            response = HttpResponse()
+            response["HX-Push-Url"] = request.get_full_path()
+            response["HX-Replace-Url"] = "false"
+            return response
+
+        request = RequestFactory().get("/", {"~order_by": "title", "_profile": "1"})
+        response = self.profile(request, get_response)
+        self.assertEqual(response["HX-Push-Url"], "/?~order_by=title")
+        self.assertEqual(response["HX-Replace-Url"], "false")
+
+    def test_profiled_requests_run_one_at_a_time(self):
+        active = []
+        overlapped = threading.Event()
+
+        def get_response(request):
+            active.append(request)
+            if len(active) > 1:
+                overlapped.set()
+            time.sleep(0.05)
+            active.remove(request)
+            return HttpResponse()
+
+        requests = [RequestFactory().get("/", {"_profile": "1"}) for _ in range(3)]
+        with ThreadPoolExecutor(len(requests)) as pool:
+            responses = list(
+                pool.map(lambda r: self.profile(r, get_response), requests)
+            )
+        self.assertFalse(overlapped.is_set())
+        self.assertEqual(len({response["X-Profile-Id"] for response in responses}), 3)
+
+
+class StartupProfileTests(SimpleTestCase):
+    def modules(self, *args):
+        out = StringIO()
+        call_command("profile_startup", "--limit", "5000", *args, stdout=out)
+        return {line.split()[-1] for line in out.getvalue().splitlines()[1:-1]}
+
+    def test_boot_leaves_the_views_unloaded(self):
+        boot = self.modules()
+        self.assertIn("movies.lazy_views", boot)
+        self.assertFalse(
+            boot & {"django_tableaux.views", "movies.views", "movies.filters"}
+        )
+        loaded = self.modules("--load-views")
+        self.assertLessEqual(
+            {"django_tableaux.views", "movies.views", "movies.filters"}, loaded
+        )
+
+
+class ResponsiveTests(SimpleTestCase):
+    def test_merge_attrs(self):
+        attrs = {
+            "class": "table",
+            "th": {"class": "bg-dark text-white", "scope": "col"},
+        }
+        extra = {
+            "th": "strong bg-dark text-white",
+            "tr": {"class": "bg-light", "id": "r"},
+        }
+        merged = _merge_attrs(attrs, extra)
+        self.assertEqual(
+            merged,
+            {
+                "class": "table",
+                "th": {"class": "bg-dark text-white strong", "scope": "col"},
+                "tr": {"class": "bg-light", "id": "r"},
+            },
+        )
+        # The table's own attrs are not changed
+        self.assertEqual(attrs["th"]["class"], "bg-dark text-white")
+        self.assertEqual(_merge_attrs(None, None), {})
+
+    def test_variants(self):
+        variants = MovieTableResponsive.variants
+        self.assertEqual(set(variants), {"sm", "md", "lg", "xl"})
+        sm, md, xl = variants["sm"], variants["md"], variants["xl"]
+        for variant in variants.values():
+            self.assertEqual(variant.__name__, "MovieTableResponsive")
+            self.assertEqual(variant.__module__, MovieTableResponsive.__module__)
+        self.assertEqual((sm.breakpoint, md.breakpoint), ("sm", "md"))
+        # sm keeps only its layout's columns, md adds its optional ones, xl keeps all
+        self.assertEqual(
+            set(sm.base_columns), {"selection", "title", "budget", "popularity"}
+        )
+        self.assertEqual(
+            set(md.base_columns),
+            {"selection", "title", "budget", "popularity", "release_date", "revenue"},
+        )
+        self.assertEqual(set(xl.base_columns), set(MovieTableResponsive.base_columns))
+        self.assertEqual(
+            sm.Meta.attrs["th"]["class"], "bg-dark text-white no-wrap strong"
+        )
+        self.assertEqual(sm.Meta.attrs["tr"]["class"], "bg-light")
+        self.assertNotIn("tr", xl.Meta.attrs)
+        self.assertEqual(
+            MovieTableResponsive.variant_for({"sm": 0, "md": 768}, "md"), md
+        )
+
+
+class ValuesRowsTests(IsolatedStateMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Cover each branch of the derived fields
+        values = [
+            dict(budget=100, revenue=250, runtime=125, movie_status="Released"),
+            dict(budget=300, revenue=200, runtime=45, movie_status="Planned"),
+            dict(budget=None, revenue=200, runtime=60, movie_status="Released"),
+            dict(budget=0, revenue=0, runtime=0, movie_status=None),
+            dict(budget=100, revenue=None, runtime=None, movie_status="Rumored"),
+            dict(budget=3, revenue=3, runtime=61, movie_status="Released"),
+            dict(budget=3, revenue=10, runtime=59, movie_status="Canceled"),
+        ]
+        for i, fields in enumerate(values):
+            Movie.objects.create(
+                title=f"Movie {i}",
+                popularity=i,
+                release_date=date(2000, 1, i + 1),
+                vote_average=Decimal("6.5"),
+                vote_count=10,
+                **fields,
+            )
+
+    def tbody(self, url_name):
+        headers = {
+            "HX-Request": "true",
+            "HX-Trigger-Name": "table_load",
+            "HX-Current-Url": f"http://testserver{reverse(url_name)}",
+        }
+        # A new client each time, so rows cached for a session are not reused
+        response = Client().get(
+            reverse(url_name), {"prefix": "", "bp": "lg"}, headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+        return re.search(r"<tbody.*</tbody>", response.content.decode(), re.S)[0]
+
+    def test_values_rows_render_as_model_rows(self):
+        for url_name in ("row_click", "select_actions", "infinite_load", "row_col"):
+            with self.subTest(url_name):
+                values = self.tbody(url_name)
+                with mock.patch.object(
+                    ValuesRowsMixin, "get_queryset", lambda view: Movie.objects.all()
+                ):
+                    models = self.tbody(url_name)
+                self.assertEqual(values, models)
+                self.assertIn("Movie 4", values)
+
+    def test_derived_fields_render_as_properties(self):
+        class DerivedTable(tables.Table):
+            class Meta:
+                model = Movie
+                fields = ("title", *DERIVED_FIELDS)
+
+        request = RequestFactory().get("/")
+        rows = Movie.objects.table_rows("id", "title", *DERIVED_FIELDS).order_by("id")
+        self.assertEqual(
+            DerivedTable(rows).as_html(request),
+            DerivedTable(Movie.objects.order_by("id")).as_html(request),
+        )
+
+
+class HistogramTests(SimpleTestCase):
+    def test_estimate_is_close_to_the_exact_count(self):
+        rng = random.Random(1)
+        values = sorted(round(rng.lognormvariate(10, 1.5)) for _ in range(2000))
+        histogram = histograms.Histogram.from_sorted([float(v) for v in values])
+        self.assertEqual(histogram.total, len(values))
+        # A range can cut two bins, each holding about total / BINS values
+        tolerance = 2 * len(values) / histograms.BINS
+        for low, high in (
+            (None, None),
+            (None, 5000),
+            (20000, 80000),
+            (100, None),
+            (50, 51),
+        ):
+            exact = sum(
+                (low is None or v >= low) and (high is None or v <= high)
+                for v in values
+            )
+            with self.subTest(low=low, high=high):
+                self.assertLessEqual(
+                    abs(histogram.estimate(low, high) - exact), tolerance
+                )
+
+    def test_empty_column(self):
+        histogram = histograms.Histogram.from_sorted([])
+        self.assertEqual(histogram.estimate(), 0)
+        self.assertEqual(histogram.estimate(1, 10), 0)
+        self.assertEqual(histogram.as_dict()["total"], 0)
+
+    def test_single_bucket_column(self):
+        histogram = histograms.Histogram.from_sorted([5.0] * 10)
+        self.assertEqual(histogram.edges, [5.0, 5.0])
+        self.assertEqual(histogram.estimate(), 10)
+        self.assertEqual(histogram.estimate(5, 5), 10)
+        self.assertEqual(histogram.estimate(6, 7), 0)
+        self.assertEqual(histogram.estimate(None, 4), 0)
+        # A value outside the range widens the bucket
+        histogram.add(7)
+        self.assertEqual((histogram.edges, histogram.total), ([5.0, 7.0], 11))
+
+
+class HistogramUpdateTests(IsolatedStateMixin, TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(histograms._histograms, state=None, version=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.movies = [
+            Movie.objects.create(title=f"Movie {i}", budget=i * 1000, runtime=60 + i)
+            for i in range(100)
+        ]
+
+    def recount(self, field, histogram):
+        """Count the stored values into the bins of histogram."""
+        exact = histograms.Histogram(list(histogram.edges), [0] * len(histogram.counts))
+        for value in Movie.objects.values_list(field, flat=True):
+            exact.add(value)
+        return exact.counts
+
+    def test_counts_follow_saves_and_deletes(self):
+        built = histograms.get_histograms()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movies[0].budget = 500000
+            self.movies[0].save()
+            self.movies[1].runtime = None
+            self.movies[1].save()
+            self.movies[2].delete()
+            Movie.objects.create(title="New", budget=1500, vote_average=Decimal("7.5"))
+        # The changes were applied to the same histograms rather than by a rebuild
+        self.assertIs(histograms.get_histograms(), built)
+        for field in histograms.RANGE_FIELDS:
+            with self.subTest(field):
+                self.assertEqual(built[field].counts, self.recount(field, built[field]))
+        self.assertEqual(built["budget"].edges[-1], 500000)
+        self.assertEqual(built["vote_average"].total, 1)
+
+    def test_missed_changes_rebuild(self):
+        built = histograms.get_histograms()
+        histograms.invalidate()
+        # The old histograms are served while a thread builds new ones; a thread
+        # cannot read the rows of this test's transaction, so the build is replaced
+        with mock.patch.object(histograms._histograms, "build", return_value={}):
+            self.assertIs(histograms.get_histograms(), built)
+            histograms._histograms.rebuilding.join(5)
+        self.assertEqual(histograms.get_histograms(), {})
@@ -0,0 +1,101 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connections
+
+from .coalesce import host_lock
+
+# Version counters in the shared cache (settings.CACHES) that tell each worker process
+# when another one has changed state it keeps, such as the title index or saved table
+# preferences. incr() is a get then a set in cache backends like FileBasedCache, so
+# concurrent bumps could be lost; they are made under a lock held across the processes
+# of the host instead. A counter missing from the cache, never set or evicted, starts
+# from the current time rather than 0, so it cannot go back to a version seen before.
+
+
+def current(key):
+    """Return the version counter at key."""
+    version = cache.get(key)
+    if version is None:
+        with host_lock("versions"):
+            version = cache.get(key)
+            if version is None:
+                version = time.time_ns()
+                cache.set(key, version, timeout=None)
+    return version
+
+
+def bump(key):
+    """Increment the version counter at key and return the new version."""
+    with host_lock("versions"):
+        version = cache.get(key)
+        version = time.time_ns() if version is None else version + 1
+        cache.set(key, version, timeout=None)
+    return version
+
+
+class VersionedState:
+    """
+    State a process derives from the database, such as the title index, kept current
+    with the version counter at key.
+
+    The first get() builds the state. When another process has bumped the version since,
+    get() keeps returning the state it has while a background thread rebuilds it, so no
+    request waits for a full rebuild. Writes made by this process are applied to its
+    state as they are committed, with changed().
+    """
+
+    def __init__(self, key, build):
+        self.key = key
+        self.build = build
+        self.state = None
+        self.version = None
+        self.rebuilding = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        version = current(self.key)
+        if self.state is None:
+            with self.lock:
+                if self.state is None:
+                    self.state = self.build()
+                    self.version = version
+        elif self.version != version:
+            with self.lock:
+                if self.version != version and self.rebuilding is None:
+                    self.rebuilding = threading.Thread(
+                        target=self._rebuild, daemon=True
+                    )
+                    self.rebuilding.start()
+        return self.state
+
+    def _rebuild(self):
+        try:
+            # Every change up to this version is committed, so the build includes it
+            version = current(self.key)
+            state = self.build()
+            with self.lock:
+                self.state = state
+                self.version = version
+        finally:
+            self.rebuilding = None
+            # Connections are per thread; this one would otherwise stay open
+            connections.close_all()
+
+    def changed(self, update=None):
+        """
+        Bump the version after a committed write, and apply it to the state with
+        update(state) unless the state had missed an earlier change, which the next
+        rebuild includes. Without update, the state is rebuilt.
+        """
+        version = bump(self.key)
+        with self.lock:
+            if (
+                update is not None
+                and self.state is not None
+                and self.version == version - 1
+            ):
+                update(self.state)
+                self.version = version
+        return version
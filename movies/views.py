@@ -1,74 +1,101 @@
+from datetime import date
+
 from django.http import HttpResponse
 from django.shortcuts import render, reverse
 from django.views.generic import ListView, TemplateView, DetailView
 from django_htmx.http import (
     HttpResponseClientRedirect,
-    retarget, trigger_client_event,
+    retarget,
 )
 from django_tableaux.views import TableauxView, SelectedMixin
-from django_tableaux.models import Pagination, FilterStyle, ClickAction
+from django_tableaux.models import FilterStyle, ClickAction
+from .coalesce import CoalesceMixin
+from .exports import BackgroundExportMixin
 from .filters import MovieFilter
 from .forms import MovieForm, BasicSettingsForm
-from .models import Movie
-from .tables import MovieTable, MovieTableSelection, MovieTableResponsive, MovieTable4
+from . import rollups
+from .models import DERIVED_FIELDS, Movie, MovieRollup
+from .preferences import PreferencesMixin, store as preferences
+from .responsive import BreakpointVariantsMixin
+from .row_cache import PageRowCacheMixin
+from .settings_changes import settings_response
+from .tables import (
+    MovieTable,
+    MovieTableSelection,
+    MovieTableResponsive,
+    MovieTable4,
+    RollupTable,
+)
+from .virtual_rows import VirtualRowsMixin
 
 class PlayView(TemplateView):
     template_name = "movies/play.html"
 
-class TableauxInteractiveView(TableauxView):
-    # Inherit the standard TableauxView and override setup so it reads parameters
-    # from the session to support the interactive demo.
-
-    def setup(self, request, *args, **kwargs):
-        super().setup(request, *args, **kwargs)
-        if "TABLEAUX_SETTINGS" in request.session.keys():
-            settings = request.session["TABLEAUX_SETTINGS"]
-            for k, v in settings.items():
-                if isinstance(v, bool):
-                    self.__setattr__(k, v)
-                elif k == "pagination":
-                    self.pagination = Pagination(v)
-                elif k == "filter_style":
-                    self.filter_style = FilterStyle(v)
-                elif k == "click_action":
-                    self.clickaction = ClickAction(v)
-                elif k == "fixed_height":
-                    self.fixed_height = int(v)
-        pass
+
+class MobileView(TemplateView):
+    # Basic table rendered in the browser from the compact data endpoint
+    template_name = "movies/mobile.html"
+
+class TableauxInteractiveView(PreferencesMixin, TableauxView):
+    # Inherit the standard TableauxView and apply the settings saved from the
+    # interactive demo's BasicSettingsForm, see movies/preferences.py
+    pass
+
+
+class ValuesRowsMixin:
+    # Render the table from compact named tuples fetched with values_list() instead of
+    # Movie instances. Derived columns such as profit are computed by the database.
+
+    def get_queryset(self):
+        return Movie.objects.table_rows(*self.get_row_fields())
+
+    def get_row_fields(self):
+        names = {f.name for f in Movie._meta.concrete_fields} | DERIVED_FIELDS.keys()
+        # django_tableaux templates read both record.id and record.pk
+        fields = ["id", "pk"]
+        for name, column in self.get_table_class().base_columns.items():
+            accessor = str(column.accessor or name).split("__")[0]
+            if accessor in names:
+                fields.append(accessor)
+        fields.extend(getattr(self, "row_cache_fields", ()))
+        return list(dict.fromkeys(fields))
 
 
 class InteractiveView(TemplateView):
     title = "Interactive tableaux view"
     template_name = "movies/interactive.html"
+    # The table view whose settings the form edits
+    settings_view = "filter_toolbar"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
-        initial = {}
-        if self.request.session.get("TABLEAUX_SETTINGS"):
-            initial=self.request.session["TABLEAUX_SETTINGS"]
+        initial = preferences.get(self.request, self.settings_view).data
         context["form"] = BasicSettingsForm(initial=initial)
-        context["url_name"] = "filter_toolbar"
+        context["url_name"] = self.settings_view
         return context
 
     def post(self, request, *args, **kwargs):
         form = BasicSettingsForm(request.POST)
-        if form.is_valid():
-            self.request.session["TABLEAUX_SETTINGS"] = {}
-            for k, v in form.cleaned_data.items():
-                self.request.session["TABLEAUX_SETTINGS"][k] = v
-            self.request.session.modified=True
-        response = HttpResponse()
-        return trigger_client_event(response, name="reloadTableaux")
+        if not form.is_valid():
+            return HttpResponse()
+        old = preferences.get(request, self.settings_view)
+        if old.data == form.cleaned_data:
+            return HttpResponse()
+        new = preferences.set(request, self.settings_view, form.cleaned_data)
+        return settings_response(request, self.settings_view, old, new, form.fields)
 
 
-class BasicInteractiveView(TableauxInteractiveView):
+class BasicInteractiveView(CoalesceMixin, ValuesRowsMixin, TableauxInteractiveView):
     title = "Basic table interactive"
     caption = "This table has a caption"
     table_class = MovieTable
     model = Movie
 
 
-class BasicView(TableauxView):
+class BasicView(
+    CoalesceMixin, ValuesRowsMixin, PageRowCacheMixin, PreferencesMixin, TableauxView
+):
+    # Applies the settings saved from BasicViewNew, see movies/preferences.py
     title = "Basic table"
     caption = "This table has a caption"
     table_class = MovieTable
@@ -85,28 +112,27 @@ class BasicView(TableauxView):
 class BasicViewNew(TemplateView):
     title = "Basic view new"
     template_name = "movies/table_component.html"
+    settings_view = "basic"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
-        initial = {}
-        if self.request.session["TABLEAUX_SETTINGS"]:
-            initial=self.request.session["TABLEAUX_SETTINGS"]
+        initial = preferences.get(self.request, self.settings_view).data
         context["form"] = BasicSettingsForm(initial=initial)
         return context
 
     def post(self, request, *args, **kwargs):
         form = BasicSettingsForm(request.POST)
-        if form.is_valid():
-            self.request.session["TABLEAUX_SETTINGS"] = {}
-            for k, v in form.cleaned_data.items():
-                self.request.session["TABLEAUX_SETTINGS"][k] = v
-            self.request.session.modified=True
-        response = HttpResponse()
-        return trigger_client_event(response, name="reloadTableaux")
+        if not form.is_valid():
+            return HttpResponse()
+        old = preferences.get(request, self.settings_view)
+        if old.data == form.cleaned_data:
+            return HttpResponse()
+        new = preferences.set(request, self.settings_view, form.cleaned_data)
+        return settings_response(request, self.settings_view, old, new, form.fields)
 
 
 
-class RowColSettingsView(TableauxView):
+class RowColSettingsView(ValuesRowsMixin, PageRowCacheMixin, TableauxView):
     title = "Row and column settings"
     table_class = MovieTable
     template_name = "movies/table.html"
@@ -121,7 +147,14 @@ class RowColSettingsView(TableauxView):
         return context
 
 
-class SelectActionsView(TableauxInteractiveView):
+class SelectActionsView(
+    CoalesceMixin,
+    BreakpointVariantsMixin,
+    ValuesRowsMixin,
+    BackgroundExportMixin,
+    PageRowCacheMixin,
+    TableauxInteractiveView,
+):
     title = "Selection and actions"
     table_class = MovieTableSelection
     template_name = "movies/table.html"
@@ -138,7 +171,14 @@ class SelectActionsView(TableauxInteractiveView):
 
     def handle_action(self, request, action):
         if action == "action_modal":
-            context = {"selected": self.selected_objects}
+            # Rows on the page just shown come from the row cache;
+            # 'All rows' still queries
+            selected = (
+                self.cached_rows(self.selected_ids) if self.selected_ids else None
+            )
+            context = {
+                "selected": selected if selected is not None else self.selected_objects
+            }
             return render(request, "movies/action_modal.html", context)
 
         elif action == "action_page":
@@ -160,7 +200,9 @@ class ActionPageView(SelectedMixin, TemplateView):
         return context
 
 
-class InfiniteScrollView(TableauxView):
+class InfiniteScrollView(
+    CoalesceMixin, VirtualRowsMixin, ValuesRowsMixin, PageRowCacheMixin, TableauxView
+):
     title = "Infinite scroll with sticky header in fixed height of 500px"
     table_class = MovieTableSelection
     template_name = "movies/table.html"
@@ -176,7 +218,7 @@ class InfiniteScrollView(TableauxView):
         return (("action_message", "Action with message"),)
 
 
-class InfiniteLoadView(TableauxView):
+class InfiniteLoadView(CoalesceMixin, ValuesRowsMixin, PageRowCacheMixin, TableauxView):
     title = "Infinite load more"
     table_class = MovieTable
     template_name = "movies/table.html"
@@ -192,7 +234,7 @@ class ResponsiveView(SelectActionsView):
     infinite_load = True
 
 
-class ResponsiveComponentView(TableauxView):
+class ResponsiveComponentView(BreakpointVariantsMixin, ValuesRowsMixin, TableauxView):
     table_class = MovieTableResponsive
     template_name = "movies/table_component.html"
     model = Movie
@@ -229,7 +271,7 @@ class MoviesFilterModalView(SelectActionsView):
     update_url = False
 
 
-class MoviesFilterHeaderView(SelectActionsView):
+class MoviesFilterHeaderView(VirtualRowsMixin, SelectActionsView):
     title = "Filter in header"
     table_class = MovieTableResponsive
     filterset_class = MovieFilter
@@ -242,7 +284,7 @@ class MoviesFilterHeaderView(SelectActionsView):
     # responsive = True
 
 
-class MoviesEditableView(TableauxView):
+class MoviesEditableView(PageRowCacheMixin, TableauxView):
     title = "Editable columns"
     model = Movie
     form_class = MovieForm
@@ -252,7 +294,7 @@ class MoviesEditableView(TableauxView):
     row_settings = True
 
 
-class MoviesRowClickView(TableauxView):
+class MoviesRowClickView(ValuesRowsMixin, TableauxView):
     title = "Click row shows detail page"
     template_name = "movies/table.html"
     table_class = MovieTable
@@ -261,7 +303,7 @@ class MoviesRowClickView(TableauxView):
     click_url_name = "movie_detail"
 
 
-class MoviesRowClickModalView(TableauxView):
+class MoviesRowClickModalView(ValuesRowsMixin, TableauxView):
     title = "Click row shows detail modal "
     template_name = "movies/table.html"
     table_class = MovieTable
@@ -270,7 +312,9 @@ class MoviesRowClickModalView(TableauxView):
     click_url_name = "movie_modal"
 
 
-class MoviesRowClickCustomView(TableauxView):
+class MoviesRowClickCustomView(
+    BreakpointVariantsMixin, ValuesRowsMixin, PageRowCacheMixin, TableauxView
+):
     title = "Custom click cell"
     template_name = "movies/table.html"
     table_class = MovieTableResponsive
@@ -278,7 +322,7 @@ class MoviesRowClickCustomView(TableauxView):
     click_action = ClickAction.CUSTOM
 
     def cell_clicked(self, pk, column_name, target):
-        movie = Movie.objects.get(pk=pk)
+        movie = self.cached_row(pk) or Movie.objects.get(pk=pk)
         context = {
             "message": f"'{movie.title}', primary key: {pk}, column: {column_name} was clicked.",
             "alert_class": "alert-info",
@@ -287,6 +331,54 @@ class MoviesRowClickCustomView(TableauxView):
         return retarget(response, "#messages")
 
 
+class RollupView(TableauxView):
+    # Movie totals by release year, or by month within the year in the URL,
+    # read from the rollup table rather than grouping the movies
+    template_name = "movies/table.html"
+    table_class = RollupTable
+    model = MovieRollup
+    filterset_fields = ["movie_status"]
+
+    @property
+    def title(self):
+        if "year" in self.kwargs:
+            return f"Movies released in {self.kwargs['year']} by month"
+        return "Movies by release year"
+
+    def get_queryset(self):
+        if "year" in self.kwargs:
+            return MovieRollup.objects.filter(year=self.kwargs["year"]).exclude(month=0)
+        return MovieRollup.objects.filter(month=0)
+
+    def process_filtered_object_list(self):
+        return rollups.totals(self.object_list)
+
+
+class RollupMoviesView(ValuesRowsMixin, TableauxView):
+    # The movies behind a RollupView row
+    template_name = "movies/table.html"
+    table_class = MovieTable
+    model = Movie
+
+    @property
+    def title(self):
+        return f"Movies released in {self.period()}"
+
+    def period(self):
+        year, month = self.kwargs["year"], self.kwargs.get("month")
+        return f"{year}-{month:02}" if month else str(year)
+
+    def get_queryset(self):
+        year, month = self.kwargs["year"], self.kwargs.get("month")
+        if month:
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1)
+        else:
+            start, end = date(year, 1, 1), date(year + 1, 1, 1)
+        queryset = super().get_queryset()
+        return queryset.filter(release_date__gte=start, release_date__lt=end)
+
+
 class MovieDetailView(DetailView):
     title = "Movie detail view"
     template_name = "movies/movie_detail.html"
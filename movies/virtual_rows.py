@@ -0,0 +1,79 @@
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponseBadRequest
+from django_tableaux.models import Pagination
+from django_tableaux.table import build_table
+
+from . import row_cache
+from .tableaux_compat import load_state
+
+# Virtual scrolling for tables with a fixed_height. Only the rows in the viewport plus
+# a buffer are in the DOM; spacer rows stand in for the others. As the user scrolls,
+# static/virtual_rows.js asks the view for a window of rows by position within the
+# current sort and filter order. The ordered ids are cached until the next Movie write.
+
+ORDER_TIMEOUT = 300
+MAX_WINDOW = 200
+
+
+class VirtualRowsMixin:
+    """
+    Use with a TableauxView that has a fixed_height.
+    The view answers ?_window=<start>&_count=<n> with the rendered rows of that window.
+    """
+
+    pagination = Pagination.INFINITE
+    window_buffer = 10
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.templates = {**self.templates, "tableaux_rows": "movies/virtual_rows.html"}
+
+    def get(self, request, *args, **kwargs):
+        if "_window" in request.GET:
+            return self.render_window(request)
+        return super().get(request, *args, **kwargs)
+
+    def ordered_ids(self):
+        """Return the ids of all rows in the current sort and filter order."""
+        state = sorted(
+            (k, str(v)) for k, v in self.query_dict.items() if self.is_state_param(k)
+        )
+        parts = (type(self).__name__, self.prefix, state, row_cache.current_version())
+        key = "virtual_rows:" + hashlib.sha1(repr(parts).encode()).hexdigest()
+        ids = cache.get(key)
+        if ids is None:
+            self.pagination = Pagination.NONE
+            table = build_table(self, prefix=self.prefix)
+            # The table has applied the sort order to its queryset
+            ids = list(table.data.data.values_list("pk", flat=True))
+            cache.set(key, ids, ORDER_TIMEOUT)
+        return ids
+
+    def render_window(self, request):
+        query = request.GET.copy()
+        try:
+            start = max(int(query.pop("_window")[0]), 0)
+            count = min(
+                max(int(query.pop("_count", [self.per_page])[0]), 1), MAX_WINDOW
+            )
+        except ValueError:
+            return HttpResponseBadRequest("Invalid window")
+        load_state(self, query)
+        self.get_filtered_object_list()
+        ids = self.ordered_ids()
+        window = ids[start : start + count]
+        position = {pk: i for i, pk in enumerate(window)}
+        self.object_list = sorted(
+            self.object_list.filter(pk__in=window),
+            key=lambda record: position[record.id],
+        )
+        # The rows are already in order so the table must not sort them again
+        self.query_dict.pop("~order_by", None)
+        self.pagination = Pagination.NONE
+        self.table = build_table(self, prefix=self.prefix)
+        context = {"view": self, "table": self.table}
+        response = self.render_to_response("movies/virtual_window.html", context)
+        response["X-Row-Count"] = len(ids)
+        return response